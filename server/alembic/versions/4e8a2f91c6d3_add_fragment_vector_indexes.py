@@ -0,0 +1,43 @@
+"""Add fragment vector indexes
+
+Revision ID: 4e8a2f91c6d3
+Revises: 9c3d5e71b2a8
+Create Date: 2026-10-18 12:31:07.219845
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8a2f91c6d3"
+down_revision: Union[str, None] = "9c3d5e71b2a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_documents_country_id"), "documents", ["country_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_fragments_document_id"), "fragments", ["document_id"], unique=False
+    )
+    op.create_index(
+        "ix_fragments_embedding_hnsw",
+        "fragments",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fragments_embedding_hnsw", table_name="fragments")
+    op.drop_index(op.f("ix_fragments_document_id"), table_name="fragments")
+    op.drop_index(op.f("ix_documents_country_id"), table_name="documents")
@@ -0,0 +1,50 @@
+"""Add enhanced questions cache
+
+Revision ID: 6b1f0c2e9a47
+Revises: d55008ed8575
+Create Date: 2026-10-18 10:12:41.503218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6b1f0c2e9a47"
+down_revision: Union[str, None] = "d55008ed8575"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "enhanced_questions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("normalized_question", sa.String(), nullable=False),
+        sa.Column("question", sa.String(), nullable=True),
+        sa.Column("valid", sa.Boolean(), nullable=False),
+        sa.Column("explanation", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_enhanced_questions_id"), "enhanced_questions", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_enhanced_questions_normalized_question"),
+        "enhanced_questions",
+        ["normalized_question"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_enhanced_questions_normalized_question"),
+        table_name="enhanced_questions",
+    )
+    op.drop_index(op.f("ix_enhanced_questions_id"), table_name="enhanced_questions")
+    op.drop_table("enhanced_questions")
@@ -0,0 +1,39 @@
+"""Unique countrydle state per user and day
+
+Revision ID: 7d2c4b8e1f60
+Revises: 4e8a2f91c6d3
+Create Date: 2026-10-18 15:47:33.102468
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2c4b8e1f60"
+down_revision: Union[str, None] = "4e8a2f91c6d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest state of every (user, day) pair; it's the one the
+    # game has always been reading.
+    op.execute("""
+        DELETE FROM countrydle_states AS s
+        USING countrydle_states AS older
+        WHERE s.user_id = older.user_id
+          AND s.day_id = older.day_id
+          AND s.id > older.id
+        """)
+    op.create_unique_constraint(
+        "uq_countrydle_states_user_day", "countrydle_states", ["user_id", "day_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_countrydle_states_user_day", "countrydle_states", type_="unique"
+    )
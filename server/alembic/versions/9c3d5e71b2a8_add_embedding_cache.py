@@ -0,0 +1,44 @@
+"""Add embedding cache
+
+Revision ID: 9c3d5e71b2a8
+Revises: 6b1f0c2e9a47
+Create Date: 2026-10-18 11:02:15.884310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy.vector import VECTOR
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3d5e71b2a8"
+down_revision: Union[str, None] = "6b1f0c2e9a47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_cache",
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("text_hash", sa.String(length=64), nullable=False),
+        sa.Column("embedding", VECTOR(), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("last_used_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("model", "text_hash"),
+    )
+    op.create_index(
+        op.f("ix_embedding_cache_last_used_at"),
+        "embedding_cache",
+        ["last_used_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_embedding_cache_last_used_at"), table_name="embedding_cache")
+    op.drop_table("embedding_cache")
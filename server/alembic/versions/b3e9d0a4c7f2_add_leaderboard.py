@@ -0,0 +1,56 @@
+"""Add leaderboard
+
+Revision ID: b3e9d0a4c7f2
+Revises: 7d2c4b8e1f60
+Create Date: 2026-10-18 16:58:12.640219
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e9d0a4c7f2"
+down_revision: Union[str, None] = "7d2c4b8e1f60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "leaderboard",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("wins", sa.Integer(), nullable=False),
+        sa.Column("streak", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_leaderboard_ranking",
+        "leaderboard",
+        ["points", "wins", "streak", "user_id"],
+        unique=False,
+    )
+    op.execute(
+        """
+        INSERT INTO leaderboard (user_id, points, wins, streak)
+        SELECT up.user_id,
+               up.points,
+               (SELECT count(*) FROM countrydle_states cs
+                WHERE cs.user_id = up.user_id AND cs.won),
+               up.streak
+        FROM user_points up
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leaderboard_ranking", table_name="leaderboard")
+    op.drop_table("leaderboard")
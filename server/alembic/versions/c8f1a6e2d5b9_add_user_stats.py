@@ -0,0 +1,66 @@
+"""Add user stats
+
+Revision ID: c8f1a6e2d5b9
+Revises: b3e9d0a4c7f2
+Create Date: 2026-10-18 18:20:41.507733
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c8f1a6e2d5b9"
+down_revision: Union[str, None] = "b3e9d0a4c7f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("wins", sa.Integer(), nullable=False),
+        sa.Column("questions_asked", sa.Integer(), nullable=False),
+        sa.Column("questions_correct", sa.Integer(), nullable=False),
+        sa.Column("questions_incorrect", sa.Integer(), nullable=False),
+        sa.Column("guesses_made", sa.Integer(), nullable=False),
+        sa.Column("guesses_correct", sa.Integer(), nullable=False),
+        sa.Column("guesses_incorrect", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute("""
+        INSERT INTO user_stats (
+            user_id, wins,
+            questions_asked, questions_correct, questions_incorrect,
+            guesses_made, guesses_correct, guesses_incorrect
+        )
+        SELECT u.id,
+               (SELECT count(*) FROM countrydle_states cs
+                WHERE cs.user_id = u.id AND cs.won),
+               q.asked, q.correct, q.incorrect,
+               g.made, g.correct, g.incorrect
+        FROM users u
+        CROSS JOIN LATERAL (
+            SELECT count(*) AS asked,
+                   count(*) FILTER (WHERE answer) AS correct,
+                   count(*) FILTER (WHERE NOT answer) AS incorrect
+            FROM questions WHERE user_id = u.id AND valid
+        ) q
+        CROSS JOIN LATERAL (
+            SELECT count(*) AS made,
+                   count(*) FILTER (WHERE answer) AS correct,
+                   count(*) FILTER (WHERE NOT answer) AS incorrect
+            FROM guesses WHERE user_id = u.id
+        ) g
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
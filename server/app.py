@@ -27,7 +27,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from users import router as users_router
 from users.utils import (
-    create_access_token,
+    create_user_access_token,
     send_verification_email,
     verify_email_token,
 )
@@ -63,7 +63,7 @@ async def login(
 ):
     user = await UserRepository(session).get_user(form_data.username)
 
-    if not user or not UserRepository.verify_password(
+    if not user or not await UserRepository.verify_password(
         form_data.password, user.hashed_password
     ):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
@@ -74,7 +74,7 @@ async def login(
             detail="User's email is not verified! Verify your email before login!",
         )
 
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_user_access_token(user)
 
     response.set_cookie(
         key="access_token",
@@ -95,7 +95,7 @@ async def google_signin(
     background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_db),
 ):
-    token_info = verify_google_token(credential.credential)
+    token_info = await verify_google_token(credential.credential)
     user = await UserRepository(session).get_by_email(token_info["email"])
 
     if not user:
@@ -110,7 +110,7 @@ async def google_signin(
             fm_noreply.send_message, message, template_name="google_login_alert.html"
         )
 
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_user_access_token(user)
 
     response.set_cookie(
         key="access_token",
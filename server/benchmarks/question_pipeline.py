@@ -0,0 +1,94 @@
+"""End-to-end latency of the two-step and single-call question pipelines.
+
+Runs the same questions against today's country through both pipelines with
+real model calls; nothing is written to the questions table or Qdrant. The
+semantic answer cache is disabled and the enhance caches are bypassed, so
+each run measures the model path. Embeddings are served from the
+`embedding_cache` table in both modes: an untimed warm-up pass stores them,
+and the in-memory caches are cleared before every question.
+
+Usage (from the server directory, with the usual .env):
+
+    python -m benchmarks.question_pipeline --repeat 3
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+import countrydle.utils as gutils
+import qdrant
+from db import AsyncSessionLocal
+from db.repositories.countrydle import CountrydleRepository
+from qdrant.vectorize import embeddings_cache
+
+QUESTIONS = [
+    "Is it in Europe?",
+    "in asia",
+    "Am I an island?",
+    "Does the country have a coastline?",
+    "Is the population over 50 million?",
+    "Is it a monarchy?",
+    "Tell me about its history",
+    "Do they drive on the left?",
+]
+
+
+def summarize(name: str, latencies: List[float]) -> str:
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    return (
+        f"{name:<9} n={len(latencies):<4} "
+        f"p50={statistics.median(latencies):8.0f} ms  "
+        f"p95={p95:8.0f} ms  "
+        f"mean={statistics.mean(latencies):8.0f} ms"
+    )
+
+
+async def ask(mode: str, question: str, day_country, user, session):
+    if mode == "single":
+        await gutils.validate_and_answer(question, day_country, user, session)
+        return
+
+    # No session: the enhance DB cache would answer every repeat otherwise.
+    enhanced = await gutils.enhance_question(question)
+    if enhanced.valid:
+        await gutils.ask_question(enhanced, day_country, user, session)
+
+
+async def run(repeat: int):
+    user = SimpleNamespace(id=0)
+    qdrant.QUESTION_CACHE_THRESHOLD = 2
+    latencies: Dict[str, List[float]] = {"two_step": [], "single": []}
+
+    async with AsyncSessionLocal() as session:
+        day_country = await CountrydleRepository(session).get_today_country()
+
+        for warm_up in [True] + [False] * repeat:
+            for question in QUESTIONS:
+                for mode in latencies:
+                    gutils.enhanced_questions_cache.clear()
+                    embeddings_cache.clear()
+
+                    start = time.perf_counter()
+                    await ask(mode, question, day_country, user, session)
+                    if not warm_up:
+                        latencies[mode].append((time.perf_counter() - start) * 1000)
+
+    for mode, values in latencies.items():
+        print(summarize(mode, values))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
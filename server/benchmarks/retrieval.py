@@ -0,0 +1,126 @@
+"""Latency/recall comparison of the fragment retrieval backends.
+
+Queries are stored fragment embeddings with Gaussian noise added, so they are
+close to, but never identical with, an indexed vector. Exact brute-force
+search over the same country's fragments is the ground truth for recall@k.
+
+Usage (from the server directory, with the usual .env):
+
+    python -m benchmarks.retrieval --countries 20 --queries 10 --limit 5
+
+Pass e.g. `--backends local,pgvector` to leave out a backend that isn't
+running.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import numpy as np
+
+import qdrant
+import qdrant.utils as qutils
+from db import AsyncSessionLocal
+from db.repositories.country import CountryRepository
+from qdrant.local_index import build_fragment_index
+
+
+async def run_sync(fn: Callable, *args):
+    return fn(*args)
+
+
+def summarize(name: str, latencies: List[float], recalls: List[float]) -> str:
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    return (
+        f"{name:<10} n={len(latencies):<5} "
+        f"p50={statistics.median(latencies):8.3f} ms  "
+        f"p95={p95:8.3f} ms  "
+        f"mean={statistics.mean(latencies):8.3f} ms  "
+        f"recall@k={statistics.mean(recalls):.4f}"
+    )
+
+
+BACKENDS = ("local", "qdrant", "pgvector")
+
+
+async def run(
+    countries: int,
+    queries: int,
+    limit: int,
+    noise: float,
+    seed: int,
+    backends: List[str] = BACKENDS,
+):
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+
+    latencies: Dict[str, List[float]] = {name: [] for name in backends}
+    recalls: Dict[str, List[float]] = {name: [] for name in backends}
+
+    async with AsyncSessionLocal() as session:
+        all_countries = await CountryRepository(session).get_all_countries()
+        sample = random.sample(all_countries, min(countries, len(all_countries)))
+
+        for country in sample:
+            index = await build_fragment_index(session, country.id)
+            if not len(index):
+                continue
+
+            picks = rng.choice(len(index), size=min(queries, len(index)), replace=False)
+            for i in picks:
+                query = index.matrix[i] + rng.normal(0, noise, index.matrix.shape[1])
+                query = query.astype(np.float32).tolist()
+                truth = {p.id for p in index.search(query, limit)}
+
+                searches: Dict[str, Callable[[], Awaitable[list]]] = {
+                    "local": lambda: run_sync(index.search, query, limit),
+                    "qdrant": lambda: qutils.search_matches(
+                        qdrant.COLLECTION_NAME, query, country.id, limit
+                    ),
+                    "pgvector": lambda: qutils.search_fragments_pgvector(
+                        query, country.id, session, limit
+                    ),
+                }
+                for name in backends:
+                    search = searches[name]
+                    start = time.perf_counter()
+                    points = await search()
+                    latencies[name].append((time.perf_counter() - start) * 1000)
+                    recalls[name].append(
+                        len(truth & {int(p.id) for p in points}) / len(truth)
+                    )
+
+    for name in latencies:
+        if latencies[name]:
+            print(summarize(name, latencies[name], recalls[name]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--countries", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    args = parser.parse_args()
+
+    backends = [name for name in args.backends.split(",") if name]
+    asyncio.run(
+        run(
+            args.countries,
+            args.queries,
+            args.limit,
+            args.noise,
+            args.seed,
+            backends,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
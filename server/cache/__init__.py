@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import metrics
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded in-process least-recently-used cache.
+
+    Hits, misses and evictions are counted on the instance and, if `name` is
+    given, also reported to `metrics` as `<name>.hit`, `<name>.miss` and
+    `<name>.eviction`.
+    """
+
+    def __init__(self, maxsize: int, name: str | None = None):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self._record("miss")
+            return default
+
+        self._data.move_to_end(key)
+        self._record("hit")
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._record("eviction")
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _record(self, event: str):
+        if event == "hit":
+            self.hits += 1
+        elif event == "miss":
+            self.misses += 1
+        else:
+            self.evictions += 1
+
+        if self.name:
+            metrics.incr(f"{self.name}.{event}")
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """`LRUCache` whose entries also expire `ttl` seconds after being set."""
+
+    def __init__(self, maxsize: int, ttl: float, name: str | None = None):
+        super().__init__(maxsize, name=name)
+        self.ttl = ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is not _MISSING and entry[0] < time.monotonic():
+            del self._data[key]
+            entry = _MISSING
+
+        if entry is _MISSING:
+            self._record("miss")
+            return default
+
+        self._data.move_to_end(key)
+        self._record("hit")
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        super().set(key, (time.monotonic() + self.ttl, value))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+import metrics
+from cache import LRUCache
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+# Upper bound on staleness for events bumped in another worker process.
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+# Clients may keep the body but must revalidate it with If-None-Match.
+CACHE_CONTROL = "public, no-cache"
+
+# Version stamps of the data behind cached responses. "game" changes when a
+# game ends or a profile changes, "day" when the day rolls over.
+versions: dict[str, int] = {"game": 0, "day": 0}
+
+
+def bump_version(*scopes: str):
+    """Invalidates every cached response that depends on one of `scopes`."""
+    for scope in scopes:
+        versions[scope] += 1
+
+
+class CachedResponse:
+    """A JSON body serialized and gzipped once, with its ETag."""
+
+    def __init__(self, content: Any):
+        self.body = json.dumps(
+            jsonable_encoder(content), separators=(",", ":")
+        ).encode()
+        self.gzip_body = gzip.compress(self.body)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.expires_at = time.monotonic() + RESPONSE_CACHE_TTL
+
+    def to_response(self, request: Request) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in (tag.strip() for tag in if_none_match.split(",")):
+            metrics.incr("response_cache.not_modified")
+            return Response(status_code=304, headers=headers)
+
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            body = self.gzip_body
+        else:
+            body = self.body
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+responses_cache = LRUCache(maxsize=RESPONSE_CACHE_SIZE, name="response_cache")
+
+
+async def cached_response(
+    request: Request,
+    key: Hashable,
+    build: Callable[[], Awaitable[Any]],
+    scopes: Iterable[str] = ("game", "day"),
+) -> Response:
+    """Serves `key` from the in-memory cache, calling `build` on a miss.
+
+    The cache key includes the version stamps of `scopes`, so bumping one of
+    them makes the next request rebuild the response.
+    """
+    scopes = tuple(scopes)
+    stamp = tuple(versions[scope] for scope in scopes)
+    if "day" in scopes:
+        stamp += (date.today(),)
+
+    full_key = (key, stamp)
+    entry: CachedResponse | None = responses_cache.get(full_key)
+    if entry is None or entry.expires_at < time.monotonic():
+        entry = CachedResponse(await build())
+        responses_cache.set(full_key, entry)
+
+    return entry.to_response(request)
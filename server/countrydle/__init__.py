@@ -1,7 +1,9 @@
-from typing import Union
+import asyncio
+import logging
+from typing import AsyncIterator, Union
 
-from db import get_db
-from db.models import User
+from db import AsyncSessionLocal, get_db
+from db.models import CountrydleState, DayCountry, Question, User
 from db.repositories.countrydle import CountrydleRepository, CountrydleStateRepository
 from schemas.countrydle import (
     CountrydleEndStateResponse,
@@ -19,13 +21,15 @@ from schemas.countrydle import (
 )
 from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from countrydle import statistics
+from countrydle.streaming import sse_event
 from db.repositories.guess import GuessRepository
 from db.repositories.question import QuestionsRepository
 from qdrant.utils import add_question_to_qdrant
-from db.repositories.country import CountryRepository
-from users.utils import get_current_user
+from countrydle.day_context import get_or_build_day_context
+from users.utils import get_current_identity, get_current_user
 
 import countrydle.utils as gutils
 
@@ -42,21 +46,14 @@ async def get_state(
     session: AsyncSession = Depends(get_db),
 ):
     day_country = await CountrydleRepository(session).get_today_country()
-    state = await CountrydleStateRepository(session).get_state(user, day_country)
-    guesses = await GuessRepository(session).get_user_day_guesses(user, day_country)
-    questions = await QuestionsRepository(session).get_user_day_questions(
-        user, day_country
-    )
-
-    if state is None:
-        return await CountrydleStateRepository(session).add_countrydle_state(
-            user, day_country
-        )
+    state, guesses, questions = await CountrydleStateRepository(
+        session
+    ).get_game_snapshot(user, day_country)
 
     questions = [
         (
             QuestionDisplay.model_validate(question)
-            if question.valid
+            if question["valid"]
             else InvalidQuestionDisplay.model_validate(question)
         )
         for question in questions
@@ -75,15 +72,14 @@ async def get_state(
 
 @router.get("/end/state", response_model=CountrydleEndStateResponse)
 async def get_end_state(
-    user: User = Depends(get_current_user),
+    user: User = Depends(get_current_identity),
     session: AsyncSession = Depends(get_db),
 ):
     day_country = await CountrydleRepository(session).get_today_country()
-    state = await CountrydleStateRepository(session).get_state(user, day_country)
-    guesses = await GuessRepository(session).get_user_day_guesses(user, day_country)
-    questions = await QuestionsRepository(session).get_user_day_questions(
-        user, day_country
-    )
+    state, guesses, questions = await CountrydleStateRepository(
+        session
+    ).get_game_snapshot(user, day_country)
+    state = CountrydleEndStateSchema.model_validate(state)
 
     if not state.is_game_over:
         raise HTTPException(
@@ -91,12 +87,12 @@ async def get_end_state(
             detail="The player is still playing the game!",
         )
 
-    country = await CountryRepository(session).get(day_country.country_id)
+    day_context = await get_or_build_day_context(session, day_country)
     return CountrydleEndStateResponse(
         user=user,
         date=str(day_country.date),
-        country=country,
-        state=CountrydleEndStateSchema.model_validate(state),
+        country=day_context.country,
+        state=state,
         guesses=guesses,
         questions=questions,
     )
@@ -109,9 +105,31 @@ async def get_game(
     session: AsyncSession = Depends(get_db),
 ):
     daily_country = await CountrydleRepository(session).get_today_country()
-    state = await CountrydleStateRepository(session).get_player_countrydle_state(
-        user, daily_country
-    )
+    state = await reserve_guess(session, user, daily_country)
+
+    try:
+        answer_dict = await gutils.give_guess(
+            guess=guess.guess, daily_country=daily_country, user=user, session=session
+        )
+
+        answer: bool = answer_dict["answer"]
+
+        guess_create = GuessCreate(
+            guess=guess.guess,
+            day_id=daily_country.id,
+            user_id=user.id,
+            answer=answer,
+        )
+        guess = await GuessRepository(session).add_guess(guess_create)
+    except Exception:
+        await CountrydleStateRepository(session).release_guess(state)
+        raise
+
+    state = await CountrydleStateRepository(session).guess_made(state, guess)
+    return guess
+
+
+def check_can_guess(state: CountrydleState):
     if not state.remaining_guesses:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -124,34 +142,40 @@ async def get_game(
             detail="User finished the game already!",
         )
 
-    answer_dict = await gutils.give_guess(
-        guess=guess.guess, daily_country=daily_country, user=user, session=session
-    )
 
-    answer: bool = answer_dict["answer"]
+async def reserve_guess(
+    session: AsyncSession, user: User, day_country: DayCountry
+) -> CountrydleState:
+    repo = CountrydleStateRepository(session)
+    state = await repo.reserve_guess(user, day_country)
+    if state is None:
+        # No state row yet, or nothing left; the check raises the right error.
+        check_can_guess(await repo.get_player_countrydle_state(user, day_country))
+        state = await repo.reserve_guess(user, day_country)
 
-    guess_create = GuessCreate(
-        guess=guess.guess,
-        day_id=daily_country.id,
-        user_id=user.id,
-        answer=answer,
-    )
-    guess = await GuessRepository(session).add_guess(guess_create)
-    state = await CountrydleStateRepository(session).guess_made(state, guess)
-    return guess
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User has no more guesses left!",
+        )
+    return state
 
 
-@router.post("/question", response_model=QuestionDisplay | InvalidQuestionDisplay)
-async def ask_question(
-    question: QuestionBase,
-    user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db),
-):
-    day_country = await CountrydleRepository(session).get_today_country()
-    state = await CountrydleStateRepository(session).get_player_countrydle_state(
-        user, day_country
-    )
+async def save_question(
+    session: AsyncSession,
+    question_create: QuestionCreate,
+    question_vector: list[float] | None,
+    country_id: int,
+) -> Question:
+    new_quest = await QuestionsRepository(session).create_question(question_create)
+
+    if question_vector is not None:
+        await add_question_to_qdrant(new_quest, question_vector, country_id)
+
+    return new_quest
+
 
+def check_can_ask(state: CountrydleState):
     if state.is_game_over:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -164,39 +188,149 @@ async def ask_question(
             detail="User has no more questions left!",
         )
 
-    enh_question = await gutils.enhance_question(question.question)
-    if not enh_question.valid:
-        question_create = QuestionCreate(
-            user_id=user.id,
-            day_id=day_country.id,
-            original_question=enh_question.original_question,
-            valid=enh_question.valid,
-            question=enh_question.question,
-            answer=None,
-            explanation=enh_question.explanation,
-            context=None,
+
+async def reserve_question(
+    session: AsyncSession, user: User, day_country: DayCountry
+) -> CountrydleState:
+    repo = CountrydleStateRepository(session)
+    state = await repo.reserve_question(user, day_country)
+    if state is None:
+        # No state row yet, or nothing left; the check raises the right error.
+        check_can_ask(await repo.get_player_countrydle_state(user, day_country))
+        state = await repo.reserve_question(user, day_country)
+
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User has no more questions left!",
         )
-        new_quest = await QuestionsRepository(session).create_question(question_create)
+    return state
 
-        state.remaining_questions -= 1
-        state.questions_asked += 1
-        state = await CountrydleStateRepository(session).update_countrydle_state(state)
 
-        return InvalidQuestionDisplay.model_validate(new_quest)
+@router.post("/question", response_model=QuestionDisplay | InvalidQuestionDisplay)
+async def ask_question(
+    question: QuestionBase,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+):
+    day_country = await CountrydleRepository(session).get_today_country()
+    state = await reserve_question(session, user, day_country)
+
+    try:
+        enh_question, question_create, question_vector = await gutils.answer_question(
+            question=question.question,
+            day_country=day_country,
+            user=user,
+            session=session,
+        )
+        if not enh_question.valid:
+            question_create = gutils.invalid_question_create(
+                enh_question, day_country, user
+            )
+            new_quest = await save_question(
+                session, question_create, None, day_country.country_id
+            )
+            return InvalidQuestionDisplay.model_validate(new_quest)
+
+        new_quest = await save_question(
+            session, question_create, question_vector, day_country.country_id
+        )
+    except Exception:
+        await CountrydleStateRepository(session).release_question(state)
+        raise
 
-    question_create, question_vector = await gutils.ask_question(
-        question=enh_question,
-        day_country=day_country,
-        user=user,
-        session=session,
-    )
+    return QuestionDisplay.model_validate(new_quest)
 
-    new_quest = await QuestionsRepository(session).create_question(question_create)
 
-    await add_question_to_qdrant(new_quest, question_vector, day_country.country_id)
+@router.post("/question/stream")
+async def ask_question_stream(
+    question: QuestionBase,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db),
+):
+    """Server-Sent Events variant of /question.
+
+    Emits a `validation` event, then `explanation` events with the answer's
+    explanation as the model writes it, and finally an `answer` event with the
+    stored question. Errors after the stream started are sent as `error`.
+    """
+    day_country = await CountrydleRepository(session).get_today_country()
+    state = await reserve_question(session, user, day_country)
+
+    return StreamingResponse(
+        question_events(question.question, day_country, user, state),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    state.remaining_questions -= 1
-    state.questions_asked += 1
-    state = await CountrydleStateRepository(session).update_countrydle_state(state)
 
-    return QuestionDisplay.model_validate(new_quest)
+async def release_question_slot(state: CountrydleState):
+    """Gives back a reserved question slot, in a session of its own.
+
+    Shielded so it completes even if the stream is cancelled; failures are
+    logged, not raised.
+    """
+
+    async def release():
+        async with AsyncSessionLocal() as session:
+            await CountrydleStateRepository(session).release_question(state)
+
+    try:
+        await asyncio.shield(release())
+    except Exception:
+        logging.exception("Releasing a question slot failed")
+
+
+async def question_events(
+    question: str, day_country: DayCountry, user: User, state: CountrydleState
+) -> AsyncIterator[str]:
+    """Answers a question whose slot in `state` is already reserved.
+
+    The slot is released unless the question is saved, including when the
+    client disconnects mid-stream.
+    """
+    reserved = True
+    try:
+        # The request session may be closed before the stream ends, so the
+        # generator works with its own.
+        async with AsyncSessionLocal() as session:
+            async for kind, payload in gutils.stream_answer_question(
+                question, day_country, user, session
+            ):
+                if kind == "validation":
+                    enh_question = payload
+                    yield sse_event("validation", enh_question.model_dump(mode="json"))
+                elif kind == "explanation":
+                    yield sse_event("explanation", {"text": payload})
+                else:
+                    question_create, question_vector = payload
+
+            if not enh_question.valid:
+                question_create = gutils.invalid_question_create(
+                    enh_question, day_country, user
+                )
+                new_quest = await save_question(
+                    session, question_create, None, day_country.country_id
+                )
+                reserved = False
+                display = InvalidQuestionDisplay.model_validate(new_quest)
+                yield sse_event("answer", display.model_dump(mode="json"))
+                return
+
+            new_quest = await save_question(
+                session,
+                question_create,
+                question_vector,
+                day_country.country_id,
+            )
+            reserved = False
+            display = QuestionDisplay.model_validate(new_quest)
+            yield sse_event("answer", display.model_dump(mode="json"))
+    except Exception as ex:
+        logging.exception("Streaming question failed")
+        reserved = False
+        await release_question_slot(state)
+        yield sse_event("error", {"detail": str(ex)})
+    finally:
+        if reserved:
+            await release_question_slot(state)
@@ -0,0 +1,290 @@
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+import pycountry
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import Country
+from db.repositories.country import CountryRepository
+
+MAX_EDIT_DISTANCE = 2
+
+# Common exonyms, endonyms and abbreviations that are not covered by the
+# ISO 3166 names and codes, keyed by alpha-3 code.
+EXTRA_ALIASES: Dict[str, List[str]] = {
+    "USA": ["us", "u s", "u s a", "america", "united states", "the states"],
+    "GBR": ["uk", "u k", "britain", "great britain", "united kingdom"],
+    "NLD": ["holland", "nederland", "netherlands", "the netherlands"],
+    "POL": ["polska", "polen", "pologne"],
+    "DEU": ["deutschland", "allemagne", "alemania", "niemcy"],
+    "FRA": ["frankreich", "francja", "francia"],
+    "ESP": ["espana", "spanien", "hiszpania"],
+    "ITA": ["italia", "italien", "wlochy"],
+    "PRT": ["portugalia"],
+    "CHE": ["schweiz", "suisse", "svizzera", "helvetia", "szwajcaria"],
+    "AUT": ["osterreich"],
+    "BEL": ["belgie", "belgique", "belgien", "belgia"],
+    "DNK": ["danmark", "dania"],
+    "SWE": ["sverige", "szwecja"],
+    "NOR": ["norge", "norwegia"],
+    "FIN": ["suomi", "finlandia"],
+    "ISL": ["islandia"],
+    "IRL": ["eire", "irlandia"],
+    "GRC": ["hellas", "ellada", "grecja"],
+    "CZE": ["czechia", "czech republic", "cesko", "czechy"],
+    "SVK": ["slovensko", "slowacja"],
+    "HUN": ["magyarorszag", "wegry"],
+    "HRV": ["hrvatska", "chorwacja"],
+    "SVN": ["slovenija", "slowenia"],
+    "SRB": ["srbija", "serbia"],
+    "ROU": ["romania", "rumunia"],
+    "BGR": ["balgariya", "bulgaria"],
+    "UKR": ["ukraina", "the ukraine"],
+    "BLR": ["byelorussia", "belarus", "bialorus"],
+    "RUS": ["russia", "rossiya", "russian federation", "rosja"],
+    "LTU": ["lietuva", "litwa"],
+    "LVA": ["latvija", "lotwa"],
+    "EST": ["eesti", "estonia"],
+    "MKD": ["macedonia", "north macedonia", "fyrom"],
+    "BIH": ["bosnia", "bih"],
+    "TUR": ["turkiye", "turkey", "turcja"],
+    "GEO": ["sakartvelo", "gruzja"],
+    "ARM": ["hayastan"],
+    "CYP": ["kypros", "cypr"],
+    "MDA": ["moldova", "moldawia"],
+    "CHN": ["prc", "zhongguo", "chiny"],
+    "TWN": ["taiwan", "roc", "republic of china"],
+    "JPN": ["nippon", "nihon", "japonia"],
+    "KOR": ["south korea", "korea", "rok", "korea poludniowa"],
+    "PRK": ["north korea", "korea", "dprk", "korea polnocna"],
+    "IND": ["bharat", "indie"],
+    "VNM": ["vietnam", "viet nam", "wietnam"],
+    "LAO": ["laos"],
+    "MMR": ["burma", "myanmar"],
+    "THA": ["siam", "tajlandia"],
+    "IRN": ["iran", "persia"],
+    "SYR": ["syria"],
+    "ARE": ["uae", "emirates", "united arab emirates"],
+    "SAU": ["ksa", "saudi", "saudi arabia"],
+    "ISR": ["israel"],
+    "PSE": ["palestine"],
+    "EGY": ["misr", "egipt"],
+    "MAR": ["maroc", "maroko"],
+    "DZA": ["algerie", "algieria"],
+    "ZAF": ["rsa", "south africa"],
+    "COD": [
+        "congo",
+        "drc",
+        "dr congo",
+        "democratic republic of the congo",
+        "congo kinshasa",
+        "zaire",
+    ],
+    "COG": ["congo brazzaville", "republic of the congo"],
+    "CIV": ["ivory coast", "cote d ivoire"],
+    "CPV": ["cape verde", "cabo verde"],
+    "SWZ": ["swaziland", "eswatini"],
+    "TZA": ["tanzania"],
+    "CAF": ["car"],
+    "MEX": ["mexico", "meksyk"],
+    "BRA": ["brasil", "brazylia"],
+    "ARG": ["argentyna"],
+    "BOL": ["bolivia"],
+    "VEN": ["venezuela"],
+    "DOM": ["dr", "dominican republic"],
+    "CAN": ["kanada"],
+    "AUS": ["oz", "aussie", "australia"],
+    "NZL": ["nz", "aotearoa"],
+    "FSM": ["micronesia"],
+    "VAT": ["vatican", "vatican city", "holy see"],
+    "TLS": ["east timor", "timor leste"],
+    "BRN": ["brunei"],
+}
+
+_NON_ALNUM_RE = re.compile(r"[^\w]+")
+_SEPARATORS_RE = re.compile(r"\b(or|and|lub|albo|oder|ou)\b|[/,;|+]")
+
+
+def fold(text: str) -> str:
+    """Accent- and case-folds a country name to its lookup form."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold().replace("&", " and ")
+    text = _NON_ALNUM_RE.sub(" ", text).strip()
+
+    if text.startswith("the "):
+        text = text[4:]
+
+    return text
+
+
+def max_distance(text: str) -> int:
+    """Edit distance tolerated for a folded guess of this length."""
+    if len(text) <= 4:
+        return 0
+    if len(text) <= 9:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """Levenshtein distance between `a` and `b`, or `bound + 1` if above it."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ca != cb),
+                )
+            )
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+
+    return previous[-1]
+
+
+def _deletes(word: str, depth: int) -> Set[str]:
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def _iso_aliases() -> Dict[str, Set[str]]:
+    aliases: Dict[str, Set[str]] = defaultdict(set)
+    for iso in pycountry.countries:
+        names = [iso.name, iso.alpha_2, iso.alpha_3]
+        names += [
+            getattr(iso, "official_name", None),
+            getattr(iso, "common_name", None),
+        ]
+        aliases[iso.alpha_3] |= {fold(name) for name in names if name}
+
+    for alpha_3, extra in EXTRA_ALIASES.items():
+        aliases[alpha_3] |= {fold(name) for name in extra}
+
+    return aliases
+
+
+class CountryAliasIndex:
+    """In-process index of every name a player may use for a country.
+
+    Exact aliases are looked up in a dict; near misses are found through a
+    deletion-neighbourhood index, so resolving a guess never scans the whole
+    alias list.
+    """
+
+    def __init__(self, countries: Iterable[Country]):
+        self.aliases: Dict[str, Set[int]] = defaultdict(set)
+        self._deletes: Dict[str, Set[str]] = defaultdict(set)
+
+        iso_aliases = _iso_aliases()
+        iso_codes: Dict[str, Set[str]] = defaultdict(set)
+        for alpha_3, names in iso_aliases.items():
+            for alias in names:
+                iso_codes[alias].add(alpha_3)
+        # Only unambiguous aliases ("korea" is not) identify a DB country.
+        alias_to_iso = {
+            alias: next(iter(codes))
+            for alias, codes in iso_codes.items()
+            if len(codes) == 1
+        }
+
+        for country in countries:
+            names = {fold(country.name), fold(country.official_name)}
+            alpha_3 = alias_to_iso.get(fold(country.name)) or alias_to_iso.get(
+                fold(country.official_name)
+            )
+            if alpha_3:
+                names |= iso_aliases[alpha_3]
+
+            for alias in names:
+                if alias:
+                    self.aliases[alias].add(country.id)
+
+        for alias in self.aliases:
+            if len(alias) > 4:
+                for variant in _deletes(alias, MAX_EDIT_DISTANCE):
+                    self._deletes[variant].add(alias)
+
+    def match(self, guess: str) -> Dict[int, int]:
+        """Returns {country_id: edit distance} for every country within bound."""
+        folded = fold(guess)
+        if folded in self.aliases:
+            return {cid: 0 for cid in self.aliases[folded]}
+
+        bound = max_distance(folded)
+        if not bound:
+            return {}
+
+        candidates: Set[str] = set()
+        for variant in _deletes(folded, bound):
+            candidates |= self._deletes.get(variant, set())
+
+        matches: Dict[int, int] = {}
+        for alias in candidates:
+            distance = edit_distance(folded, alias, bound)
+            if distance > bound:
+                continue
+            for cid in self.aliases[alias]:
+                matches[cid] = min(distance, matches.get(cid, distance))
+
+        return matches
+
+    def resolve(self, guess: str, country: Country) -> bool | None:
+        """Decides a guess locally.
+
+        Returns True/False for clear matches and non-matches, and None when the
+        guess is ambiguous and should be judged by the model.
+        """
+        folded = fold(guess)
+        if not folded:
+            return None
+
+        exact = self.aliases.get(folded)
+        if exact:
+            if exact == {country.id}:
+                return True
+            if country.id not in exact:
+                return False
+            return None
+
+        if _SEPARATORS_RE.search(folded):
+            return None
+
+        matches = self.match(folded)
+        if not matches:
+            return None
+
+        best = min(matches.values())
+        best_ids = {cid for cid, distance in matches.items() if distance == best}
+
+        if best_ids == {country.id}:
+            return True
+        if country.id not in matches:
+            return False
+        return None
+
+
+alias_index: CountryAliasIndex | None = None
+
+
+async def get_alias_index(session: AsyncSession) -> CountryAliasIndex:
+    """Returns the process-wide alias index, building it on first use."""
+    global alias_index
+    if alias_index is None:
+        countries = await CountryRepository(session).get_all_countries()
+        alias_index = CountryAliasIndex(countries)
+
+    return alias_index
@@ -0,0 +1,102 @@
+import logging
+import os
+from typing import Dict, List
+
+import metrics
+from db.models import Fragment
+from qdrant.vectorize import estimate_tokens
+
+CONTEXT_SEPARATOR = "\n[ ... ]\n"
+
+# Prompt tokens the retrieved context may take; 0 disables the budget.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+
+# Neighbouring chunks share up to `chunk_overlap` (150) characters; the
+# splitter may overshoot it slightly when it can't break on a separator.
+MAX_FRAGMENT_OVERLAP = 300
+MIN_FRAGMENT_OVERLAP = 20
+
+
+def overlap_length(
+    left: str, right: str, max_overlap: int = MAX_FRAGMENT_OVERLAP
+) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`."""
+    longest = min(max_overlap, len(left), len(right))
+    for size in range(longest, MIN_FRAGMENT_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def merge_fragments(
+    fragments: List[Fragment], scores: Dict[int, float]
+) -> List[tuple[str, float]]:
+    """Merges runs of adjacent fragments into (text, score) passages.
+
+    Fragments with consecutive ids whose texts overlap come from the same
+    document, so they are stitched together with the overlap kept once. A
+    passage scores as its best fragment.
+    """
+    passages: List[tuple[str, float]] = []
+    previous: Fragment | None = None
+
+    for fragment in sorted(fragments, key=lambda f: f.id):
+        score = scores.get(fragment.id, 0.0)
+        overlap = 0
+        if previous is not None and fragment.id == previous.id + 1:
+            overlap = overlap_length(previous.text, fragment.text)
+
+        if overlap:
+            text, best = passages[-1]
+            passages[-1] = (text + fragment.text[overlap:], max(best, score))
+        else:
+            passages.append((fragment.text, score))
+
+        previous = fragment
+
+    return passages
+
+
+def assemble_context(
+    fragments: List[Fragment],
+    scores: Dict[int, float],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+) -> str:
+    """Builds the prompt context out of the retrieved fragments.
+
+    Adjacent fragments are merged without their overlap, then the best
+    scoring passages are kept until `token_budget` is reached. The kept
+    passages stay in document order.
+    """
+    passages = merge_fragments(fragments, scores)
+
+    kept = set(range(len(passages)))
+    if token_budget > 0:
+        kept, used = set(), 0
+        by_score = sorted(range(len(passages)), key=lambda i: -passages[i][1])
+        for i in by_score:
+            tokens = estimate_tokens(passages[i][0])
+            if used + tokens <= token_budget:
+                kept.add(i)
+                used += tokens
+
+        if not kept and passages:
+            # Even the best passage is over budget; send its beginning.
+            best = by_score[0]
+            passages[best] = (passages[best][0][: token_budget * 3], 0.0)
+            kept.add(best)
+
+    context = CONTEXT_SEPARATOR.join(
+        text for i, (text, _) in enumerate(passages) if i in kept
+    )
+
+    naive_tokens = estimate_tokens(CONTEXT_SEPARATOR.join(f.text for f in fragments))
+    context_tokens = estimate_tokens(context)
+    metrics.observe("context.tokens", context_tokens)
+    metrics.observe("context.tokens_saved", naive_tokens - context_tokens)
+    logging.info(
+        f"Context: {len(fragments)} fragments -> {len(kept)} passages, "
+        f"{context_tokens} tokens ({naive_tokens - context_tokens} saved)"
+    )
+
+    return context
@@ -1,12 +1,17 @@
 import csv
 import logging
+import os
 
 import qdrant
 import qdrant.utils as qutils
+from qdrant.vectorize import get_embeddings
 from db.models import Country, Document, Fragment
 from db.repositories.country import CountryRepository
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+COUNTRIES_CSV = "data/countries.csv"
+
 
 async def populate_countries(session: AsyncSession):
     c_rep = CountryRepository(session)
@@ -15,14 +20,17 @@ async def populate_countries(session: AsyncSession):
     if countries:
         return
 
-    return
-    with open("data/countries.csv", "r", encoding="utf8") as f:
+    # Deployments usually load the countries from the SQL dumps instead.
+    if not os.path.exists(COUNTRIES_CSV):
+        logging.warning(f"No countries in the database and no {COUNTRIES_CSV}.")
+        return
+
+    documents = []
+    with open(COUNTRIES_CSV, "r", encoding="utf8") as f:
         reader = csv.DictReader(f, fieldnames=["name", "official_name", "wiki_page"])
         next(reader)
 
         for i, row in enumerate(reader):
-            fragments = []
-
             country = Country(
                 name=row["name"],
                 official_name=row["official_name"],
@@ -37,36 +45,63 @@ async def populate_countries(session: AsyncSession):
                 md_content = md_file.read()
 
             doc = Document(country=country, content=md_content)
+            texts = [
+                fragment.page_content for fragment in qutils.split_document(md_content)
+            ]
+            documents.append((country, doc, texts))
+
+    # Embed every fragment of every country in a few concurrent batches.
+    all_texts = [text for _, _, texts in documents for text in texts]
+    logging.info(f"Embedding {len(all_texts)} fragments")
+    embeddings = iter(await get_embeddings(all_texts, qdrant.EMBEDDING_MODEL))
+
+    for country, doc, texts in documents:
+        fragments = [
+            Fragment(document=doc, text=text, embedding=next(embeddings))
+            for text in texts
+        ]
+
+        logging.info(
+            f"Adding country {country.name}+document, and {len(fragments)} fragments to DB"
+        )
+
+        session.add(country)
+        session.add(doc)
+        session.add_all(fragments)
+
+        try:
+            await session.commit()  # Commit the transaction
+
+        except Exception as ex:
+            await session.rollback()
+            raise ex
+    try:
+        await session.commit()  # Commit the transaction
+
+    except Exception as ex:
+        await session.rollback()
+        raise ex
 
-            doc_fragments = qutils.split_document(md_content)
 
-            for fragment in doc_fragments:
-                frag = Fragment(
-                    document=doc,
-                    text=fragment.page_content,
-                    embedding=qutils.get_embedding(
-                        fragment.page_content, qdrant.EMBEDDING_MODEL
-                    ),
-                )
-                fragments.append(frag)
+async def reembed_fragments(session: AsyncSession, model: str = qdrant.EMBEDDING_MODEL):
+    """Recomputes all fragment embeddings, e.g. after an embedding model change.
 
-            print(
-                f"Adding country {country.name}+document, and {len(fragments)} fragments to DB"
-            )
+    Both `fragments.embedding` and the Qdrant points are rewritten. Run it
+    with `python -m countrydle.reembed`.
+    """
+    result = await session.execute(select(Fragment).order_by(Fragment.id))
+    fragments = list(result.scalars().all())
 
-            session.add(country)
-            session.add(doc)
-            session.add_all(fragments)
+    logging.info(f"Re-embedding {len(fragments)} fragments with {model}")
+    embeddings = await get_embeddings([fragment.text for fragment in fragments], model)
 
-            try:
-                await session.commit()  # Commit the transaction
+    for fragment, embedding in zip(fragments, embeddings):
+        fragment.embedding = embedding
 
-            except Exception as ex:
-                await session.rollback()
-                raise ex
     try:
-        await session.commit()  # Commit the transaction
-
+        await session.commit()
     except Exception as ex:
         await session.rollback()
         raise ex
+
+    await qdrant.populate_qdrant(session, overwrite=True)
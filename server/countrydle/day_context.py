@@ -0,0 +1,84 @@
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import metrics
+from countrydle.prompts import (
+    answer_prompt_parts,
+    guess_system_prompt,
+    validate_and_answer_prompt_parts,
+)
+from db.models import Country, DayCountry
+from db.repositories.country import CountryRepository
+from qdrant.local_index import FragmentIndex, load_day_index
+
+
+class DayContext:
+    """Everything the game handlers need about one day, computed once.
+
+    Holds the day's country and the system prompts rendered for it, so asking
+    and guessing don't load the country or rebuild prompts on every request.
+    """
+
+    def __init__(
+        self,
+        day: DayCountry,
+        country: Country,
+        fragment_index: FragmentIndex | None = None,
+    ):
+        self.day_id = day.id
+        self.date = day.date
+        self.country_id = day.country_id
+        self.country = country
+        self.fragment_index = fragment_index
+
+        self.answer_prompt = answer_prompt_parts(country.name)
+        self.validate_and_answer_prompt = validate_and_answer_prompt_parts(country.name)
+        self.guess_prompt = guess_system_prompt(country.name, country.official_name)
+
+
+# Context of today's game; replaced as a whole when the day rolls over.
+day_context: DayContext | None = None
+
+
+def get_day_context(day_id: int) -> DayContext | None:
+    """Returns the loaded context if it belongs to `day_id`, otherwise None."""
+    context = day_context
+    if context is None or context.day_id != day_id:
+        return None
+    return context
+
+
+async def build_day_context(session: AsyncSession, day: DayCountry) -> DayContext:
+    country = await CountryRepository(session).get(day.country_id)
+    return DayContext(day, country)
+
+
+async def load_day_context(session: AsyncSession, day: DayCountry) -> DayContext:
+    """Builds the context and fragment index for `day` and swaps them in."""
+    global day_context
+
+    with metrics.timed("day_context.load_ms"):
+        context = await build_day_context(session, day)
+        context.fragment_index = await load_day_index(session, day)
+
+    day_context = context
+    logging.info(f"Loaded game context for {day.date} (country {day.country_id})")
+    return context
+
+
+async def get_or_build_day_context(
+    session: AsyncSession, day: DayCountry
+) -> DayContext:
+    """Returns the loaded context for `day`, or builds a throwaway one.
+
+    The fallback only happens around midnight, before the scheduler has
+    swapped in the new day.
+    """
+    context = get_day_context(day.id)
+    if context is not None:
+        metrics.incr("day_context.hit")
+        return context
+
+    metrics.incr("day_context.miss")
+    return await build_day_context(session, day)
@@ -0,0 +1,31 @@
+"""Recomputes the fragment embeddings in Postgres and Qdrant.
+
+Run after changing EMBEDDING_MODEL (from the server directory, with the
+usual .env):
+
+    python -m countrydle.reembed
+"""
+
+import asyncio
+import logging
+
+import qdrant
+from countrydle.crud import reembed_fragments
+from db import AsyncSessionLocal
+
+
+async def reembed():
+    try:
+        async with AsyncSessionLocal() as session:
+            await reembed_fragments(session)
+    finally:
+        await qdrant.close_qdrant_client()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(reembed())
+
+
+if __name__ == "__main__":
+    main()
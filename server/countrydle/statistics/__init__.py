@@ -1,47 +1,141 @@
 import logging
+import os
+from datetime import date
+from typing import Tuple
+
 from db import get_db
 from dotenv import load_dotenv
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from schemas.countrydle import CountrydleHistory, LeaderboardEntry, UserStatistics
-from db.repositories.countrydle import CountrydleRepository, CountrydleStateRepository
+from schemas.countrydle import (
+    CountrydleHistory,
+    LeaderboardEntry,
+    LeaderboardRank,
+    UserHistoryPage,
+    UserStatistics,
+)
+from db.repositories.countrydle import (
+    HISTORY_PAGE_SIZE,
+    LEADERBOARD_PAGE_SIZE,
+    CountrydleRepository,
+    CountrydleStateRepository,
+    parse_history_cursor,
+    parse_leaderboard_cursor,
+)
 from db.models.user import User
 from db.repositories.user import UserRepository
-from users.utils import get_current_user
-
+from cache.responses import cached_response
+from users.utils import get_current_identity
 
 load_dotenv()
 
+# Serve the full, unpaginated history lists to clients that don't ask for a
+# page (no `limit` or `before`). Turn off once every client paginates.
+HISTORY_LEGACY_RESPONSE = os.getenv("HISTORY_LEGACY_RESPONSE", "true").lower() == "true"
+
 router = APIRouter(prefix="/statistics")
 
 
+def history_page_params(
+    limit: int | None = Query(None, ge=1, le=HISTORY_PAGE_SIZE),
+    before: str | None = None,
+) -> Tuple[int, Tuple[date, int] | None] | None:
+    """Page requested by the client, or None for the legacy full list."""
+    if HISTORY_LEGACY_RESPONSE and limit is None and before is None:
+        return None
+
+    cursor = None
+    if before is not None:
+        try:
+            cursor = parse_history_cursor(before)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor!")
+
+    return limit or HISTORY_PAGE_SIZE, cursor
+
+
 @router.get("/history", response_model=CountrydleHistory)
-async def gey_history(session: AsyncSession = Depends(get_db)):
-    daily_countries = await CountrydleRepository(session).get_countrydle_history()
-    countries_count = await CountrydleRepository(session).get_countries_count()
-    return CountrydleHistory(
-        daily_countries=daily_countries,
-        countries_count=countries_count,
-    )
+async def get_history(
+    request: Request,
+    page=Depends(history_page_params),
+    session: AsyncSession = Depends(get_db),
+):
+    async def build():
+        repository = CountrydleRepository(session)
+        next_cursor = None
+        if page is None:
+            daily_countries = await repository.get_countrydle_history()
+        else:
+            daily_countries, next_cursor = await repository.get_countrydle_history_page(
+                *page
+            )
+        countries_count = await repository.get_countries_count()
+        return CountrydleHistory(
+            daily_countries=daily_countries,
+            countries_count=countries_count,
+            next=next_cursor,
+        )
+
+    return await cached_response(request, ("history", page), build, scopes=("day",))
 
 
 @router.get("/leaderboard", response_model=list[LeaderboardEntry])
-async def get_leaderboard(session: AsyncSession = Depends(get_db)):
-    leaderboard = await CountrydleRepository(session).get_leaderboard()
-    return leaderboard
+async def get_leaderboard(
+    request: Request,
+    limit: int = Query(LEADERBOARD_PAGE_SIZE, ge=1, le=LEADERBOARD_PAGE_SIZE),
+    after: str | None = None,
+    session: AsyncSession = Depends(get_db),
+):
+    cursor = None
+    if after is not None:
+        try:
+            cursor = parse_leaderboard_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor!")
+
+    async def build():
+        return await CountrydleRepository(session).get_leaderboard(limit, cursor)
+
+    return await cached_response(
+        request, ("leaderboard", limit, cursor), build, scopes=("game",)
+    )
+
+
+@router.get("/leaderboard/me", response_model=LeaderboardRank)
+async def get_leaderboard_rank(
+    user: User = Depends(get_current_identity), session: AsyncSession = Depends(get_db)
+):
+    return await CountrydleRepository(session).get_leaderboard_rank(user)
 
 
 @router.get("/history/me")
-async def gey_history(
-    user: User = Depends(get_current_user), session: AsyncSession = Depends(get_db)
+async def get_my_history(
+    page=Depends(history_page_params),
+    user: User = Depends(get_current_identity),
+    session: AsyncSession = Depends(get_db),
 ):
-    data = await CountrydleStateRepository(session).get_player_countrydle_states(user)
-    return data
+    repository = CountrydleStateRepository(session)
+    if page is None:
+        data = await repository.get_player_countrydle_states(user)
+        return data
+
+    items, next_cursor = await repository.get_player_history_page(user, *page)
+    return UserHistoryPage(items=items, next=next_cursor)
 
 
 @router.get("/users/{username}", response_model=UserStatistics)
-async def get_user_statistics(username: str, session: AsyncSession = Depends(get_db)):
-    user = await UserRepository(session).get_user(username)
-    profile = await CountrydleRepository(session).get_user_statistics(user)
-    return profile
+async def get_user_statistics(
+    username: str,
+    request: Request,
+    page=Depends(history_page_params),
+    session: AsyncSession = Depends(get_db),
+):
+    """The user's profile; page through `history` with `history_next` as
+    `before`, like /history/me."""
+
+    async def build():
+        user = await UserRepository(session).get_user(username)
+        return await CountrydleRepository(session).get_user_statistics(user, page)
+
+    return await cached_response(request, ("users", username, page), build)
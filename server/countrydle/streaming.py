@@ -0,0 +1,77 @@
+import json
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+def sse_event(event: str, data) -> str:
+    """Formats one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class JsonStringFieldStreamer:
+    """Extracts the value of one string field from a JSON object as it streams.
+
+    Feed the raw model output chunk by chunk; `feed` returns the part of the
+    field's decoded value that became available with that chunk.
+    """
+
+    def __init__(self, field: str):
+        self._key = f'"{field}"'
+        self._buffer = ""
+        self._pos = 0
+        self._state = "key"  # key -> colon -> value -> done
+        self._escape: str | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        out = []
+
+        while self._pos < len(self._buffer) and self._state != "done":
+            if self._state == "key":
+                found = self._buffer.find(self._key, self._pos)
+                if found == -1:
+                    # Keep enough of the tail to match a key split across chunks.
+                    self._pos = max(self._pos, len(self._buffer) - len(self._key))
+                    break
+                self._pos = found + len(self._key)
+                self._state = "colon"
+                continue
+
+            ch = self._buffer[self._pos]
+            self._pos += 1
+
+            if self._state == "colon":
+                if ch == '"':
+                    self._state = "value"
+                continue
+
+            if self._escape is not None:
+                self._escape += ch
+                if self._escape[0] == "u":
+                    if len(self._escape) == 5:
+                        out.append(chr(int(self._escape[1:], 16)))
+                        self._escape = None
+                    continue
+                out.append(_ESCAPES.get(self._escape, self._escape))
+                self._escape = None
+            elif ch == "\\":
+                self._escape = ""
+            elif ch == '"':
+                self._state = "done"
+            else:
+                out.append(ch)
+
+        return "".join(out)
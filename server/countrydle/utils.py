@@ -1,98 +1,143 @@
 import os
 import json
-from openai import OpenAI
+import logging
+import re
+from typing import Any, AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.models import Country, DayCountry, User
-from qdrant.utils import get_fragments_matching_question
-from qdrant import COLLECTION_NAME
+import metrics
+from cache import LRUCache
+from countrydle.aliases import get_alias_index
+from countrydle.context import assemble_context
+from countrydle.day_context import get_or_build_day_context
+from countrydle.prompts import ENHANCE_SYSTEM_PROMPT, render_prompt
+from countrydle.streaming import JsonStringFieldStreamer
+
+from db.models import DayCountry, User
+from qdrant.utils import find_cached_answer, get_fragments_matching_question
+from qdrant.vectorize import get_embedding
+from qdrant import COLLECTION_NAME, EMBEDDING_MODEL
+from qdrant_client.http.models import ScoredPoint
 from schemas.country import DayCountryDisplay
 from schemas.countrydle import QuestionCreate, QuestionEnhanced
-from db.repositories.country import CountryRepository
-
-
-async def enhance_question(question: str) -> QuestionEnhanced:
-    system_prompt = """
-You are an AI assistant for a game where players guess a country by asking True/False questions. 
-Your task is to:
-
-1. Receive a user's question.
-2. Retrieve the meaning of the user's question.
-3. Determine if it is a valid True/False question about possible country.
-4. If It's valid then improve the question by make it more obvious about its intent.
-5. If It's not valid then provide an explanation why the question is not valid.
-
-Instructions:
-- The player may refer to the selected country in various ways, including:
-    - Talking about themselves or referring to being in the country: "Am I ...?", "Do I ...?" etc.
-    - Using "it/this/that": "Is it ...?", "Does it ...?", "Is this ...?", "Is that ...?" etc.
-    - Using "the country": "Is the country ...?", "Does the country ...?", "Is that country ...?" etc.
-    - Using "here" or "there": "is here ...?", "is there ...?", etc.
-    - Using short forms: "in ...?", "is ...?" etc.
-    - In different languages.
-- Always respond in English.
-- The improved question should always use the "the country" version of the question.
-
-### Output Format
-Answer with JSON format and nothing else. 
-Use the specific format:
-{
-  "question": "Improved question if question is valid",
-  "explanation": "Explanation if question is not valid",    
-  "valid": true | false
-}
-
-### Examples
-User's Question: Is it in Europe?
-Output: 
-{
-  "question": "Is the country located in Europe?",
-  "valid": true
-}
-
-User's Question: in Europe
-Output: 
-{
-  "question": "Is the country located in Europe?",
-  "valid": true
-}
-
-User's Question: Tell me about its history
-Output:
-{
-  "explanation": "This is not a True/False question.",
-  "valid": false
-}
-
-User's Question: Is it seychelles?
-{
-  "question": "Is the country Seychelles?",
-  "valid": true,
-}
-
-User's Question: Is this island/s country
-{
-  "question": "Is the country an island nation?",
-  "valid": true
-}
-
-User's Question: "asdfghjkl"
-{
-  "explanation": "The input is gibberish and not a valid True/False question.",
-  "valid": false
-}
-"""
+from db.repositories.question import EnhancedQuestionRepository
+from llm import get_llm_client
+
+ENHANCE_CACHE_SIZE = int(os.getenv("ENHANCE_CACHE_SIZE", "10000"))
+
+# "two_step" validates/rewrites and then answers with two model calls;
+# "single" does both in one call with context retrieved for the raw question.
+QUESTION_PIPELINE = os.getenv("QUESTION_PIPELINE", "two_step").lower()
+
+enhanced_questions_cache = LRUCache(
+    maxsize=ENHANCE_CACHE_SIZE, name="enhance_cache.memory"
+)
+
+_CONTRACTIONS = [
+    (re.compile(r"\b(it|that|there|what)['’]s\b"), r"\1 is"),
+    (re.compile(r"\b(is|does|do|has|was|did)n['’]t\b"), r"\1 not"),
+]
+# Comparison, math and currency symbols change what a question asks
+# ("population > 1M" vs "population < 1M"), so they are kept, spaced out.
+_OPERATOR_RE = re.compile(r"([<>=+*/%^~≤≥≠±$€£¥°])")
+# Other punctuation is folded, except decimal points and minus signs.
+_PUNCTUATION_RE = re.compile(
+    r"(?![<>=+*/%^~≤≥≠±$€£¥°])[^\w\s.\-]|(?<!\d)\.|\.(?!\d)|-(?!\d)"
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+_SUBJECT = r"(this country|that country|the country|my country|your country|it|this|that)"
+_SUBJECT_FORMS = [
+    (re.compile(rf"^(is|was|has|does|did) {_SUBJECT}\b"), r"\1 it"),
+    (re.compile(r"^am i\b"), "is it"),
+    (re.compile(r"^was i\b"), "was it"),
+    (re.compile(r"^(do|does) i\b"), "does it"),
+    (re.compile(r"^did i\b"), "did it"),
+    (re.compile(r"^(have|has) i\b"), "has it"),
+    (re.compile(r"^in\b"), "is it in"),
+]
+
+
+def normalize_question(question: str) -> str:
+    """Returns the cache key for a raw player question.
+
+    Folds case, contractions, punctuation and whitespace, and rewrites the
+    common ways of referring to the secret country ("am I", "is this",
+    "does the country", bare "in ...") to a single form. Comparison and math
+    symbols are kept, since they change the question's meaning.
+    """
+    text = question.casefold()
+
+    for pattern, replacement in _CONTRACTIONS:
+        text = pattern.sub(replacement, text)
+
+    text = _PUNCTUATION_RE.sub(" ", text)
+    text = _OPERATOR_RE.sub(r" \1 ", text)
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+
+    for pattern, replacement in _SUBJECT_FORMS:
+        text = pattern.sub(replacement, text, count=1)
+
+    return text
+
+
+async def get_cached_enhancement(
+    question: str, session: AsyncSession | None = None
+) -> QuestionEnhanced | None:
+    """Returns the cached rewrite of `question`, from memory or the DB."""
+    key = normalize_question(question)
+
+    cached = enhanced_questions_cache.get(key)
+    if cached is None and session is not None:
+        entry = await EnhancedQuestionRepository(session).get_by_normalized(key)
+        metrics.incr("enhance_cache.db.hit" if entry else "enhance_cache.db.miss")
+        if entry is not None:
+            cached = QuestionEnhanced(
+                original_question=question,
+                valid=entry.valid,
+                question=entry.question,
+                explanation=entry.explanation,
+            )
+            enhanced_questions_cache.set(key, cached)
+
+    if cached is None:
+        metrics.incr("enhance_cache.miss")
+        return None
+
+    metrics.incr("enhance_cache.hit")
+    return cached.model_copy(update={"original_question": question})
+
+
+async def cache_enhancement(
+    question: str, enhanced: QuestionEnhanced, session: AsyncSession | None = None
+):
+    key = normalize_question(question)
+    enhanced_questions_cache.set(key, enhanced)
+    if session is not None:
+        await EnhancedQuestionRepository(session).add(key, enhanced)
+
+
+async def enhance_question(
+    question: str, session: AsyncSession | None = None
+) -> QuestionEnhanced:
+    cached = await get_cached_enhancement(question, session)
+    if cached is not None:
+        return cached
+
+    return await _enhance_and_cache(question, session)
+
+
+async def _enhance_question_with_llm(question: str) -> QuestionEnhanced:
 
     question_prompt = f"""User's Question: {question}"""
 
     prompts = [
-        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": ENHANCE_SYSTEM_PROMPT},
         {"role": "user", "content": question_prompt},
     ]
     model = os.getenv("QUIZ_MODEL")
 
-    client = OpenAI()
-    response = client.chat.completions.create(
+    client = get_llm_client()
+    response = await client.chat.completions.create(
         model=model,
         messages=prompts,
         response_format={"type": "json_object"},
@@ -114,88 +159,81 @@ User's Question: "asdfghjkl"
     )
 
 
-async def ask_question(
-    question: QuestionEnhanced,
-    day_country: DayCountry,
-    user: User,
-    session: AsyncSession,
+def invalid_question_create(
+    question: QuestionEnhanced, day_country: DayCountry, user: User
 ) -> QuestionCreate:
+    return QuestionCreate(
+        user_id=user.id,
+        day_id=day_country.id,
+        original_question=question.original_question,
+        valid=question.valid,
+        question=question.question,
+        answer=None,
+        explanation=question.explanation,
+        context=None,
+    )
 
-    fragments, question_vector = await get_fragments_matching_question(
-        question.question, day_country, COLLECTION_NAME, session
+
+def cached_question_create(
+    question: QuestionEnhanced, cached: ScoredPoint, day_country: DayCountry, user: User
+) -> QuestionCreate:
+    """The answer of a previously asked, similar question, reused for `question`."""
+    return QuestionCreate(
+        user_id=user.id,
+        day_id=day_country.id,
+        original_question=question.original_question,
+        valid=question.valid,
+        question=question.question,
+        answer=cached.payload["answer"],
+        explanation=cached.payload["explonation"],
+        context=None,
     )
-    context = "\n[ ... ]\n".join(fragment.text for fragment in fragments)
-    country: Country = await CountryRepository(session).get(day_country.country_id)
-
-    system_prompt = f"""
-You are an AI assistant in a game where players try to guess a country by asking True/False questions. 
-Your task is to:
-1. Receive a valid True/False question from the player.
-2. Use the provided country and context to answer the question accurately.
-
-Instructions:
-- Base your answers primarily on the provided context. If the context does not contain enough information, use your general knowledge to provide the most accurate answer possible.
-- If you cannot determine the answer even with general knowledge, set "answer" to null.
-- Incorporate any relevant details from the provided context about the country into your explanations.
-- If the question asks whether the country is a neighbor of itself or shares boreder with itself, answer "true".
-- For any questions about events or information from April 2024 onwards, set "answer" to null.
-- Explanations should be provided before the answer.
-- Answer should be consistent with the explanation.
-
-### Country to Guess: {country.name}
-### Context: 
-[...]
-{context}
-[...]
-
-### Output Format
-You are answering the question with your best knowledge.
-Answer with JSON forma and nothing else. Use the specific format:
-{{
-    "explanation": "Your explanation for your answer."
-    "answer": true | false | null,
-}}
-### 
-
-### Examples of answers
-Country: France. Question: Is your country known for its wines?
-{{
-    "explanation": "France is known for its Bordeaux, Champagne and many more!"
-    "answer": true,
-}}
-Country: China. Question: Am I in Europe?
-{{
-    "explanation": "China is located in Asia.",
-    "answer": false
-}}
-Country: Brazil. Question: Is the country's average annual rainfall over 2000 millimeters?
-{{
-    "explanation": "The question is too vague to answer correctly.",
-    "answer": null
-}}
-
-Country: Germany. Question: Is the country a neighbor of Germany?
-{{
-    "explanation": "A country is always considered to be a neighbor of itself.",
-    "answer": true
-}}
-
-Country: Japan. Question: Has the country hosted the 2025 World Expo?
-{{
-  "explanation": "I cannot provide information about events occurring after April 2024.",
-  "answer": null
-}}
-"""
-    question_prompt = f"""Question: {question.question}"""
+
+
+def answer_prompts(
+    prompt_parts: tuple[str, str], context: str, question: str
+) -> list[dict]:
+    system_prompt = render_prompt(prompt_parts, context)
+    question_prompt = f"""Question: {question}"""
 
     prompts = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": question_prompt},
     ]
+
+    return prompts
+
+
+async def ask_question(
+    question: QuestionEnhanced,
+    day_country: DayCountry,
+    user: User,
+    session: AsyncSession,
+) -> tuple[QuestionCreate, list[float] | None]:
+    question_vector = await get_embedding(
+        question.question, EMBEDDING_MODEL, session
+    )
+
+    cached = await find_cached_answer(question_vector, day_country.country_id)
+    if cached is not None:
+        # Reused answers are not stored in Qdrant again, hence no vector.
+        return cached_question_create(question, cached, day_country, user), None
+
+    fragments, scores, question_vector = await get_fragments_matching_question(
+        question.question,
+        day_country,
+        COLLECTION_NAME,
+        session,
+        query_vector=question_vector,
+    )
+    context = assemble_context(fragments, scores)
+    day_context = await get_or_build_day_context(session, day_country)
+
+    prompts = answer_prompts(day_context.answer_prompt, context, question.question)
     model = os.getenv("QUIZ_MODEL")
 
-    client = OpenAI()
-    response = client.chat.completions.create(
+    client = get_llm_client()
+    response = await client.chat.completions.create(
         model=model,
         messages=prompts,
         response_format={"type": "json_object"},
@@ -226,59 +264,17 @@ Country: Japan. Question: Has the country hosted the 2025 World Expo?
 async def give_guess(
     guess: str, daily_country: DayCountryDisplay, user: User, session: AsyncSession
 ):
-    country: Country = await CountryRepository(session).get(daily_country.country_id)
-
-    system_prompt = f"""
-    You are the game master for a country guessing game. The player will guess a country, and you must determine if the guess is correct.
-
-    Answering Guidelines:
-        - true: If the player correctly guessed the country, including casual or abbreviated names (e.g., USA, Holland, Pol).
-        - false: If the player's guess does not match the country.
-        - null: If the guess is unclear or confusing.
-    
-    Answer guess True or False if you are fully confident of the answer.
-    Answer guess NA if guess is confusing you.
-
-    Country to Guess: {country.name} ({country.official_name})
-
-    ### Task: 
-    Use your best knowledge to determine if the player's guess is correct. Respond only in JSON format as follows:
-    {{
-        "answer": true | false | null,
-    }}
-    ### 
-    
-    ### Examples
-    Country: Poland. Guess: Polska
-    {{
-        "answer": true
-    }}
-    
-    Country: France. Guess: Franc
-    {{
-        "answer": true
-    }}
-    
-    Country: United States of America. Guess: USA 
-    {{
-        "answer": true
-    }}
-    
-    Country: Germany. Guess: Austria
-    {{
-        "answer": false
-    }}
-    
-    Country: Australia. Guess: Austria
-    {{
-        "answer": false
-    }}
-    
-    Country: France. Guess: Germany or France
-    {{
-        "answer": null
-    }} # False because player tried to cheat. He can ask one guess at a time.
-    """
+    day_context = await get_or_build_day_context(session, daily_country)
+
+    alias_index = await get_alias_index(session)
+    local_answer = alias_index.resolve(guess, day_context.country)
+    if local_answer is not None:
+        metrics.incr("guess_resolver.local")
+        return {"answer": local_answer}
+
+    metrics.incr("guess_resolver.llm")
+
+    system_prompt = day_context.guess_prompt
 
     guess_prompt = f"Guess: {guess}"
 
@@ -288,8 +284,8 @@ async def give_guess(
     ]
     model = os.getenv("QUIZ_MODEL")
 
-    client = OpenAI()
-    response = client.chat.completions.create(
+    client = get_llm_client()
+    response = await client.chat.completions.create(
         model=model,
         messages=prompts,
         response_format={"type": "json_object"},
@@ -304,3 +300,266 @@ async def give_guess(
         raise
 
     return answer_dict
+
+
+async def stream_ask_question(
+    question: QuestionEnhanced,
+    day_country: DayCountry,
+    user: User,
+    session: AsyncSession,
+) -> AsyncIterator[tuple[str, Any]]:
+    """Streaming variant of `ask_question`.
+
+    Yields ("explanation", text) while the model writes its explanation and
+    finally ("result", (question_create, question_vector)).
+    """
+    question_vector = await get_embedding(question.question, EMBEDDING_MODEL, session)
+
+    cached = await find_cached_answer(question_vector, day_country.country_id)
+    if cached is not None:
+        yield "explanation", cached.payload["explonation"]
+        yield "result", (
+            cached_question_create(question, cached, day_country, user),
+            None,
+        )
+        return
+
+    fragments, scores, question_vector = await get_fragments_matching_question(
+        question.question,
+        day_country,
+        COLLECTION_NAME,
+        session,
+        query_vector=question_vector,
+    )
+    context = assemble_context(fragments, scores)
+    day_context = await get_or_build_day_context(session, day_country)
+
+    prompts = answer_prompts(day_context.answer_prompt, context, question.question)
+    model = os.getenv("QUIZ_MODEL")
+
+    client = get_llm_client()
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=prompts,
+        response_format={"type": "json_object"},
+        stream=True,
+    )
+
+    explanation = JsonStringFieldStreamer("explanation")
+    chunks = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+
+        chunks.append(delta)
+        text = explanation.feed(delta)
+        if text:
+            yield "explanation", text
+
+    answer = "".join(chunks)
+
+    try:
+        answer_dict = json.loads(answer)
+    except json.JSONDecodeError:
+        logging.error(f"Streamed answer is not valid JSON: {answer}")
+        raise
+
+    question_create = QuestionCreate(
+        user_id=user.id,
+        day_id=day_country.id,
+        original_question=question.original_question,
+        valid=question.valid,
+        question=question.question,
+        answer=answer_dict["answer"],
+        explanation=answer_dict["explanation"],
+        context=context,
+    )
+    yield "result", (question_create, question_vector)
+
+
+async def validate_and_answer(
+    question: str,
+    day_country: DayCountry,
+    user: User,
+    session: AsyncSession,
+) -> tuple[QuestionEnhanced, QuestionCreate | None, list[float] | None]:
+    """Validates, rewrites and answers `question` with a single model call.
+
+    The context is retrieved speculatively for the raw question, before it is
+    known to be valid. Returns the enhanced question, and for valid questions
+    also the `QuestionCreate` and the vector of the improved question.
+
+    The answer cache is checked with the raw question's vector first; only
+    valid questions are cached, so a hit is answered without the model.
+    """
+    raw_vector = await get_embedding(question, EMBEDDING_MODEL, session)
+
+    cached = await find_cached_answer(raw_vector, day_country.country_id)
+    if cached is not None:
+        enhanced = QuestionEnhanced(
+            original_question=question,
+            valid=True,
+            question=cached.payload["question_text"],
+            explanation=None,
+        )
+        return (
+            enhanced,
+            cached_question_create(enhanced, cached, day_country, user),
+            None,
+        )
+
+    fragments, scores, _ = await get_fragments_matching_question(
+        question, day_country, COLLECTION_NAME, session, query_vector=raw_vector
+    )
+    context = assemble_context(fragments, scores)
+    day_context = await get_or_build_day_context(session, day_country)
+
+    system_prompt = render_prompt(day_context.validate_and_answer_prompt, context)
+    question_prompt = f"""User's Question: {question}"""
+
+    prompts = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": question_prompt},
+    ]
+    model = os.getenv("QUIZ_MODEL")
+
+    client = get_llm_client()
+    response = await client.chat.completions.create(
+        model=model,
+        messages=prompts,
+        response_format={"type": "json_object"},
+    )
+
+    answer = response.choices[0].message.content
+
+    try:
+        answer_dict = json.loads(answer)
+    except json.JSONDecodeError:
+        logging.error(f"Validate-and-answer response is not valid JSON: {answer}")
+        raise
+
+    enhanced = QuestionEnhanced(
+        original_question=question,
+        valid=answer_dict["valid"],
+        question=answer_dict.get("question") if answer_dict["valid"] else None,
+        explanation=None if answer_dict["valid"] else answer_dict["explanation"],
+    )
+    if not enhanced.valid:
+        return enhanced, None, None
+
+    question_create = QuestionCreate(
+        user_id=user.id,
+        day_id=day_country.id,
+        original_question=question,
+        valid=True,
+        question=enhanced.question,
+        answer=answer_dict["answer"],
+        explanation=answer_dict["explanation"],
+        context=context,
+    )
+    question_vector = await get_embedding(enhanced.question, EMBEDDING_MODEL, session)
+
+    return enhanced, question_create, question_vector
+
+
+async def _enhance_and_cache(
+    question: str, session: AsyncSession | None = None
+) -> QuestionEnhanced:
+    enhanced = await _enhance_question_with_llm(question)
+    await cache_enhancement(question, enhanced, session)
+    return enhanced
+
+
+async def _try_validate_and_answer(
+    question: str,
+    day_country: DayCountry,
+    user: User,
+    session: AsyncSession,
+) -> tuple[QuestionEnhanced, QuestionCreate | None, list[float] | None] | None:
+    """`validate_and_answer`, or None if the model's reply was unusable."""
+    try:
+        enhanced, question_create, question_vector = await validate_and_answer(
+            question, day_country, user, session
+        )
+    except (json.JSONDecodeError, KeyError, ValueError) as ex:
+        metrics.incr("question_pipeline.single.fallback")
+        logging.warning(f"Single-call answer failed ({ex}), falling back")
+        return None
+
+    metrics.incr("question_pipeline.single")
+    await cache_enhancement(question, enhanced, session)
+    return enhanced, question_create, question_vector
+
+
+async def answer_question(
+    question: str,
+    day_country: DayCountry,
+    user: User,
+    session: AsyncSession,
+) -> tuple[QuestionEnhanced, QuestionCreate | None, list[float] | None]:
+    """Runs the configured question pipeline.
+
+    Both pipelines first look the rewrite up in the enhance caches (memory,
+    then the DB). On a miss, "single" answers with `validate_and_answer`;
+    "two_step", a cached rewrite, and any failure of the single call use
+    `enhance_question` followed by `ask_question`. Both check the answer
+    cache before calling the model.
+    """
+    enhanced = await get_cached_enhancement(question, session)
+
+    if QUESTION_PIPELINE == "single" and enhanced is None:
+        result = await _try_validate_and_answer(question, day_country, user, session)
+        if result is not None:
+            return result
+
+    metrics.incr("question_pipeline.two_step")
+    if enhanced is None:
+        enhanced = await _enhance_and_cache(question, session)
+    if not enhanced.valid:
+        return enhanced, None, None
+
+    question_create, question_vector = await ask_question(
+        question=enhanced, day_country=day_country, user=user, session=session
+    )
+    return enhanced, question_create, question_vector
+
+
+async def stream_answer_question(
+    question: str,
+    day_country: DayCountry,
+    user: User,
+    session: AsyncSession,
+) -> AsyncIterator[tuple[str, Any]]:
+    """Streaming variant of `answer_question`, with the same pipelines and caches.
+
+    Yields ("validation", enhanced), then ("explanation", text) for valid
+    questions, and finally ("result", (question_create, question_vector));
+    `question_create` is None for invalid questions. The single-call reply
+    isn't streamed, so its explanation comes as one piece.
+    """
+    enhanced = await get_cached_enhancement(question, session)
+
+    if QUESTION_PIPELINE == "single" and enhanced is None:
+        result = await _try_validate_and_answer(question, day_country, user, session)
+        if result is not None:
+            enhanced, question_create, question_vector = result
+            yield "validation", enhanced
+            if question_create is not None:
+                yield "explanation", question_create.explanation
+            yield "result", (question_create, question_vector)
+            return
+
+    metrics.incr("question_pipeline.two_step")
+    if enhanced is None:
+        enhanced = await _enhance_and_cache(question, session)
+
+    yield "validation", enhanced
+    if not enhanced.valid:
+        yield "result", (None, None)
+        return
+
+    async for kind, payload in stream_ask_question(
+        enhanced, day_country, user, session
+    ):
+        yield kind, payload
@@ -1,7 +1,16 @@
 from .country import Country
 from .countrydle import DayCountry, CountrydleState
-from .question import Question
-from .user import User, Permission, UserPermission, AccountUpdate, UserPoints
+from .question import Question, EnhancedQuestion
+from .user import (
+    User,
+    Permission,
+    UserPermission,
+    AccountUpdate,
+    UserPoints,
+    Leaderboard,
+    UserStats,
+)
 from .guess import Guess
 from .document import Document, Fragment
 from .email import SentEmail
+from .embedding import CachedEmbedding
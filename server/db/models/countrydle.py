@@ -9,6 +9,7 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    UniqueConstraint,
     and_,
 )
 from sqlalchemy.orm import relationship, foreign
@@ -32,6 +33,9 @@ class DayCountry(Base):
 
 class CountrydleState(Base):
     __tablename__ = "countrydle_states"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day_id", name="uq_countrydle_states_user_day"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -2,6 +2,7 @@ from pgvector.sqlalchemy import Vector
 from sqlalchemy import (
     Column,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -14,7 +15,7 @@ class Document(Base):
     __tablename__ = "documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    country_id = Column(Integer, ForeignKey("countries.id"))
+    country_id = Column(Integer, ForeignKey("countries.id"), index=True)
     content = Column(String, nullable=False)
 
     country = relationship("Country", back_populates="document")
@@ -25,8 +26,18 @@ class Fragment(Base):
     __tablename__ = "fragments"
 
     id = Column(Integer, primary_key=True, index=True)
-    document_id = Column(Integer, ForeignKey("documents.id"))
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
     text = Column(String, nullable=False)
     embedding = Column(Vector(1536), nullable=False)
 
     document = relationship("Document", back_populates="fragments")
+
+    __table_args__ = (
+        Index(
+            "ix_fragments_embedding_hnsw",
+            embedding,
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
@@ -0,0 +1,21 @@
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    String,
+)
+from sqlalchemy.sql import func
+
+from db.base import Base
+
+
+class CachedEmbedding(Base):
+    __tablename__ = "embedding_cache"
+
+    model = Column(String, primary_key=True)
+    text_hash = Column(String(64), primary_key=True)
+    embedding = Column(Vector(), nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=func.now())
+    last_used_at = Column(DateTime, default=func.now(), index=True)
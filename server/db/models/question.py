@@ -33,3 +33,14 @@ class Question(Base):
 
     user = relationship("User", back_populates="questions")
     day = relationship("DayCountry")
+
+
+class EnhancedQuestion(Base):
+    __tablename__ = "enhanced_questions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    normalized_question = Column(String, unique=True, nullable=False, index=True)
+    question = Column(String)
+    valid = Column(Boolean, nullable=False)
+    explanation = Column(String)
+    created_at = Column(DateTime, default=func.now())
@@ -6,6 +6,7 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -62,6 +63,41 @@ class UserPoints(Base):
     user = relationship("User", back_populates="points")
 
 
+class UserStats(Base):
+    """Per-user totals behind the profile page, kept up to date on every
+    question, guess and finished game."""
+
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    wins = Column(Integer, default=0, nullable=False)
+    questions_asked = Column(Integer, default=0, nullable=False)
+    questions_correct = Column(Integer, default=0, nullable=False)
+    questions_incorrect = Column(Integer, default=0, nullable=False)
+    guesses_made = Column(Integer, default=0, nullable=False)
+    guesses_correct = Column(Integer, default=0, nullable=False)
+    guesses_incorrect = Column(Integer, default=0, nullable=False)
+
+
+class Leaderboard(Base):
+    """Leaderboard standings, updated whenever a player's game ends."""
+
+    __tablename__ = "leaderboard"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    points = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    streak = Column(Integer, default=0, nullable=False)
+
+    user = relationship("User")
+
+    __table_args__ = (
+        # Leaderboard order (read backwards); serves both the pages and the
+        # rank lookup.
+        Index("ix_leaderboard_ranking", points, wins, streak, user_id),
+    )
+
+
 class Permission(Base):
     __tablename__ = "permissions"
 
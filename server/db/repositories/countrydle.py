@@ -1,23 +1,95 @@
 from datetime import date
+import os
 import random
-from typing import List
+from typing import List, Tuple
 from pydantic import BaseModel
-from sqlalchemy import Integer, and_, case, cast, func, select
-from sqlalchemy.orm import joinedload, aliased, contains_eager
+from sqlalchemy import (
+    and_,
+    case,
+    cast,
+    exists,
+    false,
+    func,
+    literal,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by, insert
+from sqlalchemy.orm import (
+    joinedload,
+    aliased,
+    contains_eager,
+    make_transient_to_detached,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import metrics
+from cache.responses import bump_version
 from db.models import Country, CountrydleState, DayCountry, User
 from db.repositories.country import CountryRepository
 from db.models import Guess
 from db.repositories.user import UserRepository
-from db.models.user import UserPoints
-from schemas.countrydle import LeaderboardEntry, UserStatistics
+from db.models.user import Leaderboard, UserPoints, UserStats
+from schemas.countrydle import LeaderboardEntry, LeaderboardRank, UserStatistics
 from db.models.question import Question
-from db.repositories.question import QuestionsRepository
-from db.repositories.guess import GuessRepository
 
 MAX_GUESSES = 3
 MAX_QUESTIONS = 10
+LEADERBOARD_PAGE_SIZE = 100
+# Ranks are counted exactly down to this position only.
+LEADERBOARD_RANK_LIMIT = int(os.getenv("LEADERBOARD_RANK_LIMIT", "10000"))
+# Rows per page of the history lists.
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "30"))
+
+# Today's DayCountry keyed by its date. It changes once a day, so it's kept in
+# memory and dropped whenever day countries are generated.
+today_country_cache: dict[date, DayCountry] = {}
+
+
+def invalidate_today_country():
+    today_country_cache.clear()
+
+
+def history_cursor(day_date: date, id: int) -> str:
+    """Cursor of a history row, e.g. "2024-10-01_123"."""
+    return f"{day_date.isoformat()}_{id}"
+
+
+def parse_history_cursor(cursor: str) -> Tuple[date, int]:
+    """Inverse of `history_cursor`; raises ValueError if it's malformed."""
+    day_date, _, id = cursor.partition("_")
+    return date.fromisoformat(day_date), int(id)
+
+
+def leaderboard_cursor(points: int, wins: int, streak: int, user_id: int) -> str:
+    """Cursor of a leaderboard entry: its ranking key, e.g. "2500_3_1_42"."""
+    return f"{points}_{wins}_{streak}_{user_id}"
+
+
+def parse_leaderboard_cursor(cursor: str) -> Tuple[int, int, int, int]:
+    """Inverse of `leaderboard_cursor`; raises ValueError if it's malformed."""
+    points, wins, streak, user_id = (int(part) for part in cursor.split("_"))
+    return points, wins, streak, user_id
+
+
+def _country_row(row) -> dict | None:
+    if row.country_name is None:
+        return None
+    return {
+        "id": row.country_id,
+        "name": row.country_name,
+        "official_name": row.country_official_name,
+    }
+
+
+def _page(rows: list, limit: int) -> Tuple[list, str | None]:
+    """Trims the extra row fetched past `limit` into the next page cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, history_cursor(rows[-1].date, rows[-1].id)
 
 
 class CountrydleRepository:
@@ -41,13 +113,32 @@ class CountrydleRepository:
         return result.scalars().first()
 
     async def get_today_country(self) -> DayCountry | None:
+        today = date.today()
+        cached = today_country_cache.get(today)
+        if cached is not None:
+            metrics.incr("today_country_cache.hit")
+            return await self.session.merge(cached, load=False)
+
+        metrics.incr("today_country_cache.miss")
         result = await self.session.execute(
             select(DayCountry)
-            .where(DayCountry.date == date.today())
+            .where(DayCountry.date == today)
             .order_by(DayCountry.id.desc())
         )
+        day_country = result.scalars().first()
+
+        if day_country is not None:
+            # Cache a detached copy, so it outlives this session.
+            snapshot = DayCountry(
+                id=day_country.id,
+                country_id=day_country.country_id,
+                date=day_country.date,
+            )
+            make_transient_to_detached(snapshot)
+            today_country_cache.clear()
+            today_country_cache[today] = snapshot
 
-        return result.scalars().first()
+        return day_country
 
     async def get_last_added_day_country(self) -> DayCountry | None:
         result = await self.session.execute(
@@ -112,6 +203,46 @@ class CountrydleRepository:
 
         return result.scalars().all()
 
+    async def get_countrydle_history_page(
+        self, limit: int = HISTORY_PAGE_SIZE, before: Tuple[date, int] | None = None
+    ) -> Tuple[List[dict], str | None]:
+        """Returns one page of past day countries, newest first.
+
+        Pages are keyset paginated on (date, id): `before` is the key of the
+        last row of the previous page. Returns the rows and the cursor of the
+        next page, or None on the last one.
+        """
+        stmt = (
+            select(
+                DayCountry.id,
+                DayCountry.date,
+                DayCountry.country_id,
+                Country.name.label("country_name"),
+                Country.official_name.label("country_official_name"),
+            )
+            .join(Country, Country.id == DayCountry.country_id)
+            .where(DayCountry.date < date.today())
+            .order_by(DayCountry.date.desc(), DayCountry.id.desc())
+            .limit(limit + 1)
+        )
+        if before is not None:
+            stmt = stmt.where(tuple_(DayCountry.date, DayCountry.id) < tuple_(*before))
+
+        result = await self.session.execute(stmt)
+        rows, next_cursor = _page(result.all(), limit)
+
+        daily_countries = [
+            {
+                "id": row.id,
+                "date": row.date,
+                "country_id": row.country_id,
+                "country": _country_row(row),
+            }
+            for row in rows
+        ]
+
+        return daily_countries, next_cursor
+
     async def get_countries_count(self):
         dc = aliased(DayCountry)
         stmt = (
@@ -135,30 +266,70 @@ class CountrydleRepository:
 
         return countries_with_count
 
-    async def get_leaderboard(self):
-        cs = aliased(CountrydleState)
-        up = aliased(UserPoints)
-        stmt = (
+    async def get_leaderboard(
+        self,
+        limit: int = LEADERBOARD_PAGE_SIZE,
+        after: Tuple[int, int, int, int] | None = None,
+    ) -> List[LeaderboardEntry]:
+        """Returns one page of the leaderboard.
+
+        Pages are keyset paginated: `after` is the parsed cursor of the last
+        entry of the previous page, so pages stay consistent while scores
+        change. Users who haven't finished a game yet rank last with zeros.
+        """
+        ranking = tuple_(
+            Leaderboard.points,
+            Leaderboard.wins,
+            Leaderboard.streak,
+            Leaderboard.user_id,
+        )
+        ranked = (
             select(
-                User.id,
-                User.username,
-                func.coalesce(up.points, 0).label("points"),
-                func.coalesce(func.sum(cs.won.cast(Integer)), 0).label("wins"),
-                func.coalesce(up.streak, 0).label("streak"),
+                Leaderboard.user_id,
+                Leaderboard.points,
+                Leaderboard.wins,
+                Leaderboard.streak,
             )
-            .outerjoin(up, User.id == up.user_id)
-            .outerjoin(cs, User.id == cs.user_id)
-            .group_by(
+            .order_by(
+                Leaderboard.points.desc(),
+                Leaderboard.wins.desc(),
+                Leaderboard.streak.desc(),
+                Leaderboard.user_id.desc(),
+            )
+            .limit(limit)
+        )
+        # Users without a leaderboard row rank as (0, 0, 0, id); listing them
+        # separately keeps both halves on an index, bounded by `limit`.
+        unranked = (
+            select(User.id, literal(0), literal(0), literal(0))
+            .where(~exists().where(Leaderboard.user_id == User.id))
+            .order_by(User.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            ranked = ranked.where(ranking < tuple_(*after))
+            if tuple(after[:3]) == (0, 0, 0):
+                unranked = unranked.where(User.id < after[3])
+            elif tuple(after[:3]) < (0, 0, 0):
+                unranked = unranked.where(false())
+
+        board = union_all(ranked, unranked).subquery("board")
+        stmt = (
+            select(
                 User.id,
                 User.username,
-                up.points,
-                up.streak,
+                board.c.points,
+                board.c.wins,
+                board.c.streak,
             )
+            .join(User, User.id == board.c.user_id)
             .order_by(
-                func.coalesce(up.points, 0).desc(),
-                func.coalesce(func.sum(cs.won.cast(Integer)), 0).desc(),
-                func.coalesce(up.streak, 0).desc(),
+                board.c.points.desc(),
+                board.c.wins.desc(),
+                board.c.streak.desc(),
+                board.c.user_id.desc(),
             )
+            .limit(limit)
         )
 
         result = await self.session.execute(stmt)
@@ -170,44 +341,114 @@ class CountrydleRepository:
                 points=row.points,
                 streak=row.streak,
                 wins=row.wins,
+                cursor=leaderboard_cursor(row.points, row.wins, row.streak, row.id),
             )
             for row in result.all()
         ]
 
         return leaderboard
 
-    async def get_user_statistics(self, user: User) -> UserStatistics:
-        up = await UserRepository(self.session).get_user_points(user.id)
+    async def get_leaderboard_rank(self, user: User) -> LeaderboardRank:
+        """Returns the user's leaderboard entry and 1-based rank.
+
+        Users without a leaderboard row rank as (0, 0, 0, id), as in
+        `get_leaderboard`. Counting the entries above the user costs O(rank)
+        index reads, so the count stops at LEADERBOARD_RANK_LIMIT: users
+        further down get rank LEADERBOARD_RANK_LIMIT + 1 with `rank_capped`.
+        """
         result = await self.session.execute(
-            select(
-                func.sum(CountrydleState.won.cast(Integer)).label("wins"),
-            ).where(CountrydleState.user_id == user.id)
+            select(Leaderboard.points, Leaderboard.wins, Leaderboard.streak).where(
+                Leaderboard.user_id == user.id
+            )
+        )
+        row = result.first()
+        points, wins, streak = row if row is not None else (0, 0, 0)
+        key = (points, wins, streak, user.id)
+
+        ranking = tuple_(
+            Leaderboard.points,
+            Leaderboard.wins,
+            Leaderboard.streak,
+            Leaderboard.user_id,
+        )
+        above = [
+            select(Leaderboard.user_id)
+            .where(ranking > tuple_(*key))
+            .limit(LEADERBOARD_RANK_LIMIT)
+        ]
+        if (points, wins, streak) == (0, 0, 0):
+            # Unranked users with a higher id tie with this one on the rest.
+            above.append(
+                select(User.id)
+                .where(
+                    User.id > user.id,
+                    ~exists().where(Leaderboard.user_id == User.id),
+                )
+                .limit(LEADERBOARD_RANK_LIMIT)
+            )
+        counted = union_all(*above).subquery()
+        above_count = await self.session.scalar(
+            select(func.count()).select_from(counted)
         )
-        wins = result.scalar() or 0
-        questions_asked, corr_quest, incorr_questions = await QuestionsRepository(
-            self.session
-        ).get_user_question_statistics(user)
+        capped = above_count >= LEADERBOARD_RANK_LIMIT
 
-        guesses_made, guesses_correct, guesses_incorrect = await GuessRepository(
-            self.session
-        ).get_user_guess_statistics(user)
+        return LeaderboardRank(
+            id=user.id,
+            username=user.username,
+            points=points,
+            streak=streak,
+            wins=wins,
+            cursor=leaderboard_cursor(*key),
+            rank=LEADERBOARD_RANK_LIMIT + 1 if capped else above_count + 1,
+            rank_capped=capped,
+        )
 
-        history = await CountrydleStateRepository(
-            self.session
-        ).get_player_countrydle_states(user, show_today=False)
+    async def get_user_statistics(
+        self,
+        user: User,
+        history_page: Tuple[int, Tuple[date, int] | None] | None = (
+            HISTORY_PAGE_SIZE,
+            None,
+        ),
+    ) -> UserStatistics:
+        """Returns the user's profile with one page of their history.
+
+        `history_page` is `(limit, before)` as for `get_player_history_page`;
+        None returns the whole history.
+        """
+        result = await self.session.execute(
+            select(UserPoints, UserStats)
+            .select_from(User)
+            .outerjoin(UserPoints, UserPoints.user_id == User.id)
+            .outerjoin(UserStats, UserStats.user_id == User.id)
+            .where(User.id == user.id)
+        )
+        up, stats = result.one()
+        stats = stats or UserStats()
+
+        history_next = None
+        if history_page is not None:
+            history, history_next = await CountrydleStateRepository(
+                self.session
+            ).get_player_history_page(user, *history_page, show_today=False)
+        else:
+            history = await CountrydleStateRepository(
+                self.session
+            ).get_player_countrydle_states(user, show_today=False)
 
         profile = UserStatistics(
             user=user,
-            points=up.points,
-            streak=up.streak,
-            wins=wins,
-            questions_asked=questions_asked,
-            questions_correct=corr_quest,
-            questions_incorrect=incorr_questions,
-            guesses_made=guesses_made,
-            guesses_correct=guesses_correct,
-            guesses_incorrect=guesses_incorrect,
+            points=up.points if up else 0,
+            streak=up.streak if up else 0,
+            wins=stats.wins or 0,
+            questions_asked=stats.questions_asked or 0,
+            questions_correct=stats.questions_correct or 0,
+            questions_incorrect=stats.questions_incorrect or 0,
+            guesses_made=stats.guesses_made or 0,
+            guesses_correct=stats.guesses_correct or 0,
+            guesses_incorrect=stats.guesses_incorrect or 0,
             history=history,
+            history_next=history_next,
         )
 
         return profile
@@ -224,52 +465,195 @@ class CountrydleStateRepository:
 
         return result.scalars().first()
 
-    async def calc_points(self, state: CountrydleState) -> int:
-        question_points = state.remaining_questions * 100
-        guess_points = 100 * (((state.remaining_guesses + 1) ** 2) + 1)
+    @staticmethod
+    def calc_points():
+        """Points of a won game, as an SQL expression over the state row."""
+        question_points = CountrydleState.remaining_questions * 100
+        guess_points = 100 * (
+            (CountrydleState.remaining_guesses + 1)
+            * (CountrydleState.remaining_guesses + 1)
+            + 1
+        )
 
         return question_points + guess_points
 
-    async def guess_made(self, state: CountrydleState, guess: Guess) -> CountrydleState:
-        state.guesses_made += 1
-        state.remaining_guesses -= 1
+    async def _transition(
+        self, *criteria, commit: bool = True, **values
+    ) -> CountrydleState | None:
+        """Applies `values` to the state row matching `criteria` in one UPDATE.
+
+        Returns the updated state, or None if no row matched. With
+        `commit=False` the update is left in the caller's transaction.
+        """
+        result = await self.session.execute(
+            update(CountrydleState)
+            .where(*criteria)
+            .values(**values)
+            .returning(CountrydleState)
+            .execution_options(populate_existing=True)
+        )
+        state = result.scalars().first()
 
-        if not state.remaining_guesses:
-            state.is_game_over = True
-            state.won = False
+        if not commit:
+            return state
 
-        if guess.answer:
-            state.is_game_over = True
-            state.won = True
+        try:
+            await self.session.commit()
+        except Exception as ex:
+            await self.session.rollback()
+            raise ex
 
-        points = 0
-        if state.won:
-            points = await self.calc_points(state)
-            state.points = points
+        return state
 
-        if state.is_game_over:
-            await UserRepository(self.session).update_points(state.user_id, state)
+    def _open_game(self, user: User, day: DayCountry):
+        return (
+            CountrydleState.user_id == user.id,
+            CountrydleState.day_id == day.id,
+            CountrydleState.is_game_over == False,
+        )
 
-        await self.session.commit()
+    async def reserve_question(
+        self, user: User, day: DayCountry
+    ) -> CountrydleState | None:
+        """Spends one of the player's questions if any is left.
+
+        Returns None if the game is over, no question is left or there is no
+        state yet. Call `release_question` if the question is not saved.
+        """
+        return await self._transition(
+            *self._open_game(user, day),
+            CountrydleState.remaining_questions > 0,
+            remaining_questions=CountrydleState.remaining_questions - 1,
+            questions_asked=CountrydleState.questions_asked + 1,
+        )
 
-        return state
+    async def release_question(self, state: CountrydleState) -> CountrydleState:
+        return await self._transition(
+            CountrydleState.id == state.id,
+            remaining_questions=CountrydleState.remaining_questions + 1,
+            questions_asked=CountrydleState.questions_asked - 1,
+        )
+
+    async def reserve_guess(
+        self, user: User, day: DayCountry
+    ) -> CountrydleState | None:
+        """Same as `reserve_question`, for guesses."""
+        return await self._transition(
+            *self._open_game(user, day),
+            CountrydleState.remaining_guesses > 0,
+            remaining_guesses=CountrydleState.remaining_guesses - 1,
+            guesses_made=CountrydleState.guesses_made + 1,
+        )
+
+    async def release_guess(self, state: CountrydleState) -> CountrydleState:
+        return await self._transition(
+            CountrydleState.id == state.id,
+            remaining_guesses=CountrydleState.remaining_guesses + 1,
+            guesses_made=CountrydleState.guesses_made - 1,
+        )
+
+    async def guess_made(self, state: CountrydleState, guess: Guess) -> CountrydleState:
+        """Ends the game after a reserved guess if it was right or the last one."""
+        if not guess.answer and state.remaining_guesses:
+            return state
+
+        # Ending the game and crediting the points commit together, so a
+        # failure can't leave a finished game without its points.
+        try:
+            finished = await self._transition(
+                CountrydleState.id == state.id,
+                CountrydleState.is_game_over == False,
+                commit=False,
+                is_game_over=True,
+                won=bool(guess.answer),
+                points=self.calc_points() if guess.answer else CountrydleState.points,
+            )
+            if finished is not None:
+                await UserRepository(self.session).update_points(
+                    finished.user_id, finished
+                )
+            await self.session.commit()
+        except Exception as ex:
+            await self.session.rollback()
+            raise ex
+
+        if finished is None:
+            # A concurrent guess has already ended the game.
+            return state
+
+        bump_version("game")
+
+        return finished
 
     async def get_player_countrydle_state(
         self, user: User, day: DayCountry
     ) -> CountrydleState:
+        """Returns the player's state for `day`, creating it if missing.
+
+        The state usually exists, so it's read first; the insert only runs on
+        the player's first visit of the day.
+        """
         result = await self.session.execute(
-            select(CountrydleState)
-            .where(CountrydleState.user_id == user.id, CountrydleState.day_id == day.id)
-            .order_by(CountrydleState.id.asc())
+            select(CountrydleState).where(
+                CountrydleState.user_id == user.id, CountrydleState.day_id == day.id
+            )
         )
-
-        state = result.scalars().first()
+        state = result.scalars().one_or_none()
 
         if state is None:
             return await self.add_countrydle_state(user, day)
 
         return state
 
+    async def get_game_snapshot(
+        self, user: User, day: DayCountry
+    ) -> Tuple[CountrydleState | dict, List[dict], List[dict]]:
+        """Loads the player's state, guesses and questions for `day` in one query.
+
+        Rows come back as dicts (questions without their context), ready to be
+        validated by the response schemas. A missing state is created.
+        """
+        states = CountrydleState.__table__
+        guesses = Guess.__table__
+        questions = Question.__table__
+
+        state_json = (
+            select(func.to_jsonb(states.table_valued(), type_=JSONB))
+            .where(states.c.user_id == user.id, states.c.day_id == day.id)
+            .order_by(states.c.id.asc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+        def rows_json(table, row):
+            return (
+                select(
+                    func.coalesce(
+                        func.jsonb_agg(aggregate_order_by(row, table.c.id)),
+                        literal([], JSONB),
+                        type_=JSONB,
+                    )
+                )
+                .where(table.c.user_id == user.id, table.c.day_id == day.id)
+                .scalar_subquery()
+            )
+
+        guesses_json = rows_json(guesses, func.to_jsonb(guesses.table_valued()))
+        questions_json = rows_json(
+            questions,
+            func.to_jsonb(questions.table_valued()).op("-")("context"),
+        )
+
+        result = await self.session.execute(
+            select(state_json, guesses_json, questions_json)
+        )
+        state, day_guesses, day_questions = result.one()
+
+        if state is None:
+            state = await self.add_countrydle_state(user, day)
+
+        return state, day_guesses, day_questions
+
     async def get_player_countrydle_states(
         self, user: User, show_today: bool = True
     ) -> List[CountrydleState]:
@@ -298,6 +682,78 @@ class CountrydleStateRepository:
 
         return states
 
+    async def get_player_history_page(
+        self,
+        user: User,
+        limit: int = HISTORY_PAGE_SIZE,
+        before: Tuple[date, int] | None = None,
+        show_today: bool = True,
+    ) -> Tuple[List[dict], str | None]:
+        """Returns one page of the player's finished games, newest first.
+
+        Only the columns the history shows are selected. Pages are keyset
+        paginated on (date, id) like `get_countrydle_history_page`.
+        """
+        stmt = (
+            select(
+                CountrydleState.id,
+                CountrydleState.remaining_questions,
+                CountrydleState.remaining_guesses,
+                CountrydleState.questions_asked,
+                CountrydleState.guesses_made,
+                CountrydleState.is_game_over,
+                CountrydleState.won,
+                CountrydleState.points,
+                CountrydleState.day_id,
+                DayCountry.date,
+                DayCountry.country_id,
+                Country.name.label("country_name"),
+                Country.official_name.label("country_official_name"),
+            )
+            .join(DayCountry, DayCountry.id == CountrydleState.day_id)
+            .join(Country, Country.id == DayCountry.country_id)
+            .where(
+                and_(
+                    CountrydleState.user_id == user.id,
+                    CountrydleState.is_game_over,
+                )
+            )
+            .order_by(DayCountry.date.desc(), CountrydleState.id.desc())
+            .limit(limit + 1)
+        )
+        if before is not None:
+            stmt = stmt.where(
+                tuple_(DayCountry.date, CountrydleState.id) < tuple_(*before)
+            )
+
+        result = await self.session.execute(stmt)
+        rows, next_cursor = _page(result.all(), limit)
+
+        today = date.today()
+        history = [
+            {
+                "id": row.id,
+                "remaining_questions": row.remaining_questions,
+                "remaining_guesses": row.remaining_guesses,
+                "questions_asked": row.questions_asked,
+                "guesses_made": row.guesses_made,
+                "is_game_over": row.is_game_over,
+                "won": row.won,
+                "points": row.points,
+                "day": {
+                    "id": row.day_id,
+                    "date": row.date,
+                    "country_id": row.country_id,
+                    "country": (
+                        _country_row(row) if show_today or row.date != today else None
+                    ),
+                },
+            }
+            for row in rows
+        ]
+
+        return history, next_cursor
+
     async def add_countrydle_state(
         self,
         user: User,
@@ -305,40 +761,51 @@ class CountrydleStateRepository:
         max_questions: int = MAX_QUESTIONS,
         max_guesses: int = MAX_GUESSES,
     ) -> CountrydleState:
+        """Creates the player's state for `day`, or returns the existing one.
 
-        new_entry = CountrydleState(
-            user_id=user.id,
-            day_id=day.id,
-            remaining_questions=max_questions,
-            remaining_guesses=max_guesses,
-            questions_asked=0,
-            guesses_made=0,
+        The insert is a no-op if the state already exists (e.g. created by a
+        concurrent request), so a player never gets two states for one day.
+        """
+        result = await self.session.execute(
+            insert(CountrydleState)
+            .values(
+                user_id=user.id,
+                day_id=day.id,
+                remaining_questions=max_questions,
+                remaining_guesses=max_guesses,
+                questions_asked=0,
+                guesses_made=0,
+                is_game_over=False,
+                won=False,
+                points=0,
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "day_id"])
+            .returning(CountrydleState)
         )
-
-        self.session.add(new_entry)
+        new_entry = result.scalars().first()
 
         try:
-            await self.session.commit()  # Commit the transaction
-            await self.session.refresh(new_entry)  # Refresh the instance to get the ID
+            await self.session.commit()
         except Exception as ex:
             await self.session.rollback()
             raise ex
 
+        if new_entry is None:
+            result = await self.session.execute(
+                select(CountrydleState)
+                .where(
+                    CountrydleState.user_id == user.id,
+                    CountrydleState.day_id == day.id,
+                )
+                .execution_options(populate_existing=True)
+            )
+            new_entry = result.scalars().one()
+
         return new_entry
 
     async def get_state(self, user: User, day: DayCountry) -> CountrydleState:
-        result = await self.session.execute(
-            select(CountrydleState)
-            .where(CountrydleState.user_id == user.id, CountrydleState.day_id == day.id)
-            .order_by(CountrydleState.id.asc())
-        )
-
-        state = result.scalars().first()
-
-        if state is None:
-            return await self.add_countrydle_state(user, day)
-
-        return state
+        """Same as `get_player_countrydle_state`."""
+        return await self.get_player_countrydle_state(user, day)
 
     async def update_countrydle_state(self, state: CountrydleState):
         await self.session.merge(state)
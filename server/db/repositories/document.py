@@ -1,10 +1,54 @@
-from typing import List
-from sqlalchemy import select
+import logging
+import os
+from typing import List, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import load_only
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from db import engine
 from db.models import Country, Document, Fragment
 from schemas.country import CountryBase
 
+# Candidates the HNSW index collects per scan (pgvector's default is 40).
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", "100"))
+# The country filter is applied after the index scan, so the scan has to go
+# on until enough rows pass it (pgvector >= 0.8). "off" disables it.
+PGVECTOR_ITERATIVE_SCAN = os.getenv("PGVECTOR_ITERATIVE_SCAN", "strict_order")
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def set_vector_search_settings(dbapi_connection, connection_record):
+    """Applies the HNSW settings once per pooled connection.
+
+    hnsw.iterative_scan only exists since pgvector 0.8; older versions reject
+    it on PostgreSQL 15+ ("hnsw" is a reserved prefix), so it's skipped there.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        row = cursor.fetchone()
+        if row is None:
+            return
+
+        cursor.execute(
+            "SELECT set_config('hnsw.ef_search', $1, false)", (str(PGVECTOR_EF_SEARCH),)
+        )
+        version = tuple(int(part) for part in row[0].split(".")[:2])
+        if version >= (0, 8):
+            cursor.execute(
+                "SELECT set_config('hnsw.iterative_scan', $1, false)",
+                (PGVECTOR_ITERATIVE_SCAN,),
+            )
+        elif PGVECTOR_ITERATIVE_SCAN != "off":
+            logging.warning(
+                f"pgvector {row[0]} has no iterative index scans; filtered "
+                "searches may return fewer fragments than asked for."
+            )
+    finally:
+        cursor.close()
+        # Settings made in a rolled back transaction would be undone.
+        dbapi_connection.commit()
+
 
 class DocumentRepository:
     def __init__(self, session: AsyncSession):
@@ -53,6 +97,44 @@ class FragmentRepository:
 
         return result.scalars().first()
 
+    async def get_many(self, fids: List[int]) -> List[Fragment]:
+        """Loads fragments in one query, returned in the order of `fids`."""
+        if not fids:
+            return []
+
+        result = await self.session.execute(
+            select(Fragment).where(Fragment.id.in_(fids))
+        )
+        by_id = {fragment.id: fragment for fragment in result.scalars().all()}
+
+        return [by_id[fid] for fid in fids if fid in by_id]
+
+    async def get_fragments_for_country(self, country_id: int) -> List[Fragment]:
+        result = await self.session.execute(
+            select(Fragment)
+            .join(Document, Fragment.document_id == Document.id)
+            .where(Document.country_id == country_id)
+            .order_by(Fragment.id)
+        )
+
+        return result.scalars().all()
+
+    async def search_similar(
+        self, query_vector: List[float], country_id: int, limit: int = 5
+    ) -> List[Tuple[Fragment, float]]:
+        """Returns (fragment, cosine distance) pairs closest to `query_vector`."""
+        distance = Fragment.embedding.cosine_distance(query_vector).label("distance")
+        result = await self.session.execute(
+            select(Fragment, distance)
+            .options(load_only(Fragment.id, Fragment.text))
+            .join(Document, Fragment.document_id == Document.id)
+            .where(Document.country_id == country_id)
+            .order_by(distance)
+            .limit(limit)
+        )
+
+        return [(fragment, float(dist)) for fragment, dist in result.all()]
+
     async def get_fragments_for_doc(self, doc_id: int) -> List[Fragment]:
         result = await self.session.execute(
             select(Fragment).where(Fragment.document_id == doc_id)
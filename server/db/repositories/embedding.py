@@ -0,0 +1,99 @@
+from typing import Dict, List, Tuple
+from sqlalchemy import (
+    Integer,
+    String,
+    column,
+    delete,
+    func,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import CachedEmbedding
+
+
+class EmbeddingCacheRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, model: str, text_hash: str) -> List[float] | None:
+        result = await self.session.execute(
+            select(CachedEmbedding.embedding).where(
+                CachedEmbedding.model == model,
+                CachedEmbedding.text_hash == text_hash,
+            )
+        )
+        embedding = result.scalars().first()
+
+        return None if embedding is None else [float(x) for x in embedding]
+
+    async def record_hits(self, hits: Dict[Tuple[str, str], int]) -> int:
+        """Adds `hits` ((model, text_hash) -> count) and marks the rows used.
+
+        All rows are updated in one statement, so lookups themselves stay
+        read-only.
+        """
+        if not hits:
+            return 0
+
+        used = values(
+            column("model", String),
+            column("text_hash", String),
+            column("hits", Integer),
+            name="used",
+        ).data([(model, text_hash, n) for (model, text_hash), n in hits.items()])
+        result = await self.session.execute(
+            update(CachedEmbedding)
+            .where(
+                CachedEmbedding.model == used.c.model,
+                CachedEmbedding.text_hash == used.c.text_hash,
+            )
+            .values(hits=CachedEmbedding.hits + used.c.hits, last_used_at=func.now())
+        )
+
+        try:
+            await self.session.commit()
+        except Exception as ex:
+            await self.session.rollback()
+            raise ex
+
+        return result.rowcount
+
+    async def add(self, model: str, text_hash: str, embedding: List[float]) -> None:
+        stmt = (
+            insert(CachedEmbedding)
+            .values(model=model, text_hash=text_hash, embedding=embedding)
+            .on_conflict_do_nothing(index_elements=["model", "text_hash"])
+        )
+
+        try:
+            await self.session.execute(stmt)
+            await self.session.commit()
+        except Exception as ex:
+            await self.session.rollback()
+            raise ex
+
+    async def prune(self, max_rows: int) -> int:
+        """Deletes the least recently used rows above `max_rows`."""
+        keep = (
+            select(CachedEmbedding.model, CachedEmbedding.text_hash)
+            .order_by(CachedEmbedding.last_used_at.desc())
+            .limit(max_rows)
+        )
+        result = await self.session.execute(
+            delete(CachedEmbedding).where(
+                tuple_(CachedEmbedding.model, CachedEmbedding.text_hash).not_in(keep)
+            )
+        )
+
+        try:
+            await self.session.commit()
+        except Exception as ex:
+            await self.session.rollback()
+            raise ex
+
+        return result.rowcount
@@ -3,6 +3,7 @@ from sqlalchemy import Integer, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models import DayCountry, Guess, User
+from db.repositories.user import UserRepository
 from schemas.countrydle import (
     GuessCreate,
 )
@@ -23,6 +24,12 @@ class GuessRepository:
         self.session.add(new_entry)
 
         try:
+            await UserRepository(self.session).add_to_user_stats(
+                guess.user_id,
+                guesses_made=1,
+                guesses_correct=int(guess.answer is True),
+                guesses_incorrect=int(guess.answer is False),
+            )
             await self.session.commit()  # Commit the transaction
             await self.session.refresh(new_entry)  # Refresh the instance to get the ID
         except Exception as ex:
@@ -1,10 +1,13 @@
 from typing import List
 from sqlalchemy import Integer, and_, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.models import DayCountry, Question, User
+from db.models import DayCountry, EnhancedQuestion, Question, User
+from db.repositories.user import UserRepository
 from schemas.countrydle import (
     QuestionCreate,
+    QuestionEnhanced,
 )
 
 
@@ -23,6 +26,13 @@ class QuestionsRepository:
         self.session.add(new_entry)
 
         try:
+            if quesiton.valid:
+                await UserRepository(self.session).add_to_user_stats(
+                    quesiton.user_id,
+                    questions_asked=1,
+                    questions_correct=int(quesiton.answer is True),
+                    questions_incorrect=int(quesiton.answer is False),
+                )
             await self.session.commit()  # Commit the transaction
             await self.session.refresh(new_entry)  # Refresh the instance to get the ID
         except Exception as ex:
@@ -53,3 +63,36 @@ class QuestionsRepository:
         row = questions_result.first()
         print(row)
         return row
+
+
+class EnhancedQuestionRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_normalized(self, normalized: str) -> EnhancedQuestion | None:
+        result = await self.session.execute(
+            select(EnhancedQuestion).where(
+                EnhancedQuestion.normalized_question == normalized
+            )
+        )
+
+        return result.scalars().first()
+
+    async def add(self, normalized: str, enhanced: QuestionEnhanced) -> None:
+        stmt = (
+            insert(EnhancedQuestion)
+            .values(
+                normalized_question=normalized,
+                question=enhanced.question,
+                valid=enhanced.valid,
+                explanation=enhanced.explanation,
+            )
+            .on_conflict_do_nothing(index_elements=["normalized_question"])
+        )
+
+        try:
+            await self.session.execute(stmt)
+            await self.session.commit()
+        except Exception as ex:
+            await self.session.rollback()
+            raise ex
@@ -1,13 +1,37 @@
 from datetime import datetime, timedelta
+import os
 import re
 from fastapi import HTTPException
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, exists, func, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+import passwords
+from cache import TTLCache
+from cache.responses import bump_version
 
 from db.models import Permission, User, AccountUpdate
 from schemas.user import UserCreate, UserUpdate
 from db.models.countrydle import CountrydleState
-from db.models.user import UserPoints
+from db.models.guess import Guess
+from db.models.question import Question
+from db.models.user import Leaderboard, UserPoints, UserStats
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+# Verified users keyed by username (the JWT subject). Entries are detached
+# copies; anything that changes a user's username, password or verification
+# must call `invalidate_cached_user`.
+verified_users_cache = TTLCache(
+    maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL, name="user_cache"
+)
+
+
+def invalidate_cached_user(*usernames: str):
+    for username in usernames:
+        verified_users_cache.pop(username)
 
 
 class UserRepository:
@@ -15,8 +39,8 @@ class UserRepository:
         self.session = session
 
     @staticmethod
-    def verify_password(password, db_password):
-        return User.verify_password(password, db_password)
+    async def verify_password(password, db_password):
+        return await passwords.verify_password(password, db_password)
 
     async def get(self, uid) -> User | None:
         result = await self.session.execute(select(User).where(User.id == uid))
@@ -47,6 +71,27 @@ class UserRepository:
 
         return result.scalars().first()
 
+    async def get_cached_verified_user(self, username: str) -> User | None:
+        """`get_veified_user_by_username` served from `verified_users_cache`."""
+        cached = verified_users_cache.get(username)
+        if cached is not None:
+            return await self.session.merge(cached, load=False)
+
+        user = await self.get_veified_user_by_username(username)
+        if user is not None:
+            snapshot = User(
+                id=user.id,
+                username=user.username,
+                email=user.email,
+                hashed_password=user.hashed_password,
+                verified=user.verified,
+                created_at=user.created_at,
+            )
+            make_transient_to_detached(snapshot)
+            verified_users_cache.set(username, snapshot)
+
+        return user
+
     async def get_user(self, username: str) -> User | None:
         result = await self.session.execute(
             select(User).where(User.username == username)
@@ -89,7 +134,7 @@ class UserRepository:
         if user_in_db:
             raise HTTPException(status_code=400, detail="Email already taken!")
 
-        hashed_password = User.hash_password(user.password)
+        hashed_password = await passwords.hash_password(user.password)
         new_user = User(
             username=user.username, email=user.email, hashed_password=hashed_password
         )
@@ -119,6 +164,7 @@ class UserRepository:
         user = result.scalar_one()
         user.verified = True
         await self.session.commit()
+        invalidate_cached_user(user.username)
 
         return user
 
@@ -137,14 +183,160 @@ class UserRepository:
         return user_points
 
     async def update_points(self, user_id: int, state: CountrydleState):
+        """Adds the finished game `state` to the user's points, in the caller's
+        transaction. The caller commits and bumps the "game" version."""
         user_points = await self.get_user_points(user_id)
         if not user_points:
-            user_points = await self.add_user_points(user_id)
+            user_points = UserPoints(user_id=user_id, points=0, streak=0)
+            self.session.add(user_points)
+            await self.session.flush()
 
         user_points.streak = user_points.streak + 1 if state.won else 0
         user_points.points += state.points
 
-        await self.session.commit()
+        await self.update_leaderboard(user_points, int(state.won))
+        await self.add_to_user_stats(user_id, wins=int(state.won))
+
+    async def get_broken_streaks(self, day_id: int) -> list[int]:
+        """Ids of verified users with a streak who didn't finish day `day_id`."""
+        finished = exists().where(
+            CountrydleState.user_id == UserPoints.user_id,
+            CountrydleState.day_id == day_id,
+            CountrydleState.is_game_over,
+        )
+        result = await self.session.execute(
+            select(UserPoints.user_id)
+            .join(User, User.id == UserPoints.user_id)
+            .where(User.verified == True, UserPoints.streak > 0, ~finished)
+        )
+
+        return list(result.scalars().all())
+
+    async def reset_streaks(self, user_ids: list[int]):
+        """Zeroes the streaks of `user_ids` in one transaction."""
+        if not user_ids:
+            return
+
+        for table in (UserPoints, Leaderboard):
+            await self.session.execute(
+                update(table)
+                .where(table.user_id.in_(user_ids), table.streak != 0)
+                .values(streak=0)
+                .execution_options(synchronize_session=False)
+            )
+
+        try:
+            await self.session.commit()
+        except Exception as ex:
+            await self.session.rollback()
+            raise ex
+
+        bump_version("game")
+
+    async def update_leaderboard(self, user_points: UserPoints, new_wins: int = 0):
+        """Copies `user_points` into the leaderboard, in the caller's transaction."""
+        stmt = insert(Leaderboard).values(
+            user_id=user_points.user_id,
+            points=user_points.points,
+            streak=user_points.streak,
+            wins=new_wins,
+        )
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[Leaderboard.user_id],
+                set_={
+                    "points": stmt.excluded.points,
+                    "streak": stmt.excluded.streak,
+                    "wins": Leaderboard.wins + stmt.excluded.wins,
+                },
+            )
+        )
+
+    async def add_to_user_stats(self, user_id: int, **deltas: int):
+        """Adds `deltas` to the user's stats row, in the caller's transaction."""
+        stmt = insert(UserStats).values(user_id=user_id, **deltas)
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[UserStats.user_id],
+                set_={
+                    name: getattr(UserStats, name) + getattr(stmt.excluded, name)
+                    for name in deltas
+                },
+            )
+        )
+
+    async def get_user_stats(self, user_id: int) -> UserStats | None:
+        result = await self.session.execute(
+            select(UserStats).where(UserStats.user_id == user_id)
+        )
+
+        return result.scalars().first()
+
+    async def rebuild_user_stats(self) -> int:
+        """Recomputes every user's stats from their questions, guesses and games."""
+        wins = (
+            select(func.count())
+            .where(CountrydleState.user_id == User.id, CountrydleState.won == True)
+            .scalar_subquery()
+        )
+        questions = (
+            select(
+                func.count().label("asked"),
+                func.count().filter(Question.answer == True).label("correct"),
+                func.count().filter(Question.answer == False).label("incorrect"),
+            )
+            .where(Question.user_id == User.id, Question.valid == True)
+            .lateral()
+        )
+        guesses = (
+            select(
+                func.count().label("made"),
+                func.count().filter(Guess.answer == True).label("correct"),
+                func.count().filter(Guess.answer == False).label("incorrect"),
+            )
+            .where(Guess.user_id == User.id)
+            .lateral()
+        )
+        rows = (
+            select(
+                User.id,
+                wins,
+                questions.c.asked,
+                questions.c.correct,
+                questions.c.incorrect,
+                guesses.c.made,
+                guesses.c.correct,
+                guesses.c.incorrect,
+            )
+            .select_from(User)
+            .join(questions, true())
+            .join(guesses, true())
+        )
+        columns = [
+            "user_id",
+            "wins",
+            "questions_asked",
+            "questions_correct",
+            "questions_incorrect",
+            "guesses_made",
+            "guesses_correct",
+            "guesses_incorrect",
+        ]
+        stmt = insert(UserStats).from_select(columns, rows)
+        result = await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[UserStats.user_id],
+                set_={name: getattr(stmt.excluded, name) for name in columns[1:]},
+            )
+        )
+
+        try:
+            await self.session.commit()
+        except Exception as ex:
+            await self.session.rollback()
+            raise ex
+
+        return result.rowcount
 
     async def get_last_user_update(self, user_id: int) -> AccountUpdate | None:
         since = datetime.now() - timedelta(days=30)
@@ -191,6 +383,8 @@ class UserRepository:
         self.session.add(new_update)
 
         await self.session.commit()
+        invalidate_cached_user(new_update.username, user.username)
+        bump_version("game")
         await self.session.refresh(user)
         await self.session.refresh(new_update)
 
@@ -198,10 +392,11 @@ class UserRepository:
 
     async def change_password(self, user_id: int, password: str) -> User:
         user = await self.get(user_id)
-        new_hashed_password = User.hash_password(password)
+        new_hashed_password = await passwords.hash_password(password)
         user.hashed_password = new_hashed_password
 
         await self.session.commit()
+        invalidate_cached_user(user.username)
         await self.session.refresh(user)
 
         return user
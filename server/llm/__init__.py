@@ -0,0 +1,44 @@
+import os
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+load_dotenv()
+
+QUIZ_MODEL = os.getenv("QUIZ_MODEL")
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+
+client: AsyncOpenAI | None = None
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """Returns the process-wide AsyncOpenAI client, creating it on first use.
+
+    All LLM calls share one pooled httpx client, so concurrent requests reuse
+    keep-alive connections instead of opening a new one per call.
+    """
+    global client
+    if client is None:
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+        )
+        client = AsyncOpenAI(http_client=http_client, timeout=LLM_TIMEOUT)
+
+    return client
+
+
+async def close_llm_client():
+    """Closes the LLM client and its connection pool if it's open."""
+    global client
+    if client is not None:
+        await client.close()
+        client = None
@@ -0,0 +1,116 @@
+import json
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+
+_lock = Lock()
+_counters: dict[str, int] = defaultdict(int)
+_observations: dict[str, dict[str, float]] = {}
+
+
+def incr(name: str, value: int = 1):
+    """Increments the counter `name` by `value`."""
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float):
+    """Records a single observation (latency, score, size...) for `name`."""
+    with _lock:
+        obs = _observations.get(name)
+        if obs is None:
+            _observations[name] = {
+                "count": 1,
+                "sum": value,
+                "min": value,
+                "max": value,
+                "last": value,
+            }
+            return
+
+        obs["count"] += 1
+        obs["sum"] += value
+        obs["min"] = min(obs["min"], value)
+        obs["max"] = max(obs["max"], value)
+        obs["last"] = value
+
+
+@contextmanager
+def timed(name: str):
+    """Observes the wall time of the wrapped block in milliseconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - start) * 1000)
+
+
+def hit_rate(name: str) -> float:
+    """Returns `name.hit / (name.hit + name.miss)`, or 0.0 if nothing recorded."""
+    with _lock:
+        hits = _counters.get(f"{name}.hit", 0)
+        misses = _counters.get(f"{name}.miss", 0)
+
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+def hit_rates() -> dict[str, dict[str, float]]:
+    """Hits, misses and hit rate of every `<name>.hit`/`<name>.miss` pair."""
+    with _lock:
+        counters = dict(_counters)
+
+    names = {
+        name.rsplit(".", 1)[0]
+        for name in counters
+        if name.endswith(".hit") or name.endswith(".miss")
+    }
+    rates = {}
+    for name in sorted(names):
+        hits = counters.get(f"{name}.hit", 0)
+        misses = counters.get(f"{name}.miss", 0)
+        rates[name] = {
+            "hits": hits,
+            "misses": misses,
+            "rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    return rates
+
+
+def snapshot() -> dict:
+    """Returns a copy of all counters and observation summaries."""
+    with _lock:
+        counters = dict(_counters)
+        observations = {
+            name: {**obs, "avg": obs["sum"] / obs["count"]}
+            for name, obs in _observations.items()
+        }
+
+    return {
+        "counters": counters,
+        "observations": observations,
+        "hit_rates": hit_rates(),
+    }
+
+
+def log_snapshot():
+    """Logs the cache hit rates, and the whole snapshot at debug level."""
+    rates = hit_rates()
+    if rates:
+        logging.info(
+            "Cache hit rates: "
+            + ", ".join(
+                f"{name}={rate['rate']:.1%} ({rate['hits']}/{rate['hits'] + rate['misses']})"
+                for name, rate in rates.items()
+            )
+        )
+    logging.debug(f"Metrics: {json.dumps(snapshot(), sort_keys=True)}")
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _observations.clear()
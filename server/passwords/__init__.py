@@ -0,0 +1,56 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from fastapi import HTTPException, status
+
+import metrics
+from db.models import User
+
+# bcrypt releases the GIL, so a few threads keep hashing off the event loop.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Hashes allowed to wait for a worker before new ones are turned away.
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+_pending = 0
+
+
+async def _run(func: Callable, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        metrics.incr("password_hash.rejected")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, try again in a moment.",
+        )
+
+    _pending += 1
+    queued_at = time.perf_counter()
+    try:
+        async with _slots:
+            metrics.observe(
+                "password_hash.queue_ms", (time.perf_counter() - queued_at) * 1000
+            )
+            with metrics.timed("password_hash.run_ms"):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(executor, func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(User.hash_password, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _run(User.verify_password, password, hashed_password)
+
+
+def shutdown_password_executor():
+    executor.shutdown(wait=False, cancel_futures=True)
@@ -8,7 +8,7 @@ from db.models import Country, Document, Fragment
 from db.repositories.country import CountryRepository
 from db.repositories.document import DocumentRepository, FragmentRepository
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http.exceptions import ResponseHandlingException
 from qdrant_client.models import Distance, PointStruct, VectorParams, IntegerIndexParams
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,22 +22,47 @@ EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
 
 QDRANT_HOST = os.getenv("QDRANT_HOST")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT"))
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", "10"))
 COLLECTION_NAME = os.getenv("COLLECTION_NAME")
+QUESTIONS_COLLECTION_NAME = "questions"
 
-client: QdrantClient = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+# Minimum cosine similarity for reusing the answer of a previously asked
+# question about the same country. Values above 1 disable the answer cache.
+QUESTION_CACHE_THRESHOLD = float(os.getenv("QUESTION_CACHE_THRESHOLD", "0.95"))
+
+# "local" answers searches for today's country from an in-process NumPy index
+# and falls back to Qdrant for other days; "qdrant" always queries Qdrant;
+# "pgvector" runs every search in Postgres (HNSW index on fragments.embedding).
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "local").lower()
+
+# Build the answer context from the point payloads instead of Postgres.
+FRAGMENTS_FROM_PAYLOAD = os.getenv("FRAGMENTS_FROM_PAYLOAD", "true").lower() == "true"
+
+# One client per process; it keeps its HTTP/gRPC connections open between calls.
+client: AsyncQdrantClient = AsyncQdrantClient(
+    host=QDRANT_HOST,
+    port=QDRANT_PORT,
+    grpc_port=QDRANT_GRPC_PORT,
+    prefer_grpc=QDRANT_PREFER_GRPC,
+    timeout=QDRANT_TIMEOUT,
+)
 
 
 async def init_qdrant(session: AsyncSession):
-    if not client.collection_exists("questions"):
-        client.create_collection(
-            collection_name="questions",
+    if not await client.collection_exists(QUESTIONS_COLLECTION_NAME):
+        await client.create_collection(
+            collection_name=QUESTIONS_COLLECTION_NAME,
             vectors_config=VectorParams(size=EMBEDDING_SIZE, distance=Distance.COSINE),
         )
-        client.create_payload_index(
-            collection_name="questions", field_name="country_id", field_schema="integer"
+        await client.create_payload_index(
+            collection_name=QUESTIONS_COLLECTION_NAME,
+            field_name="country_id",
+            field_schema="integer",
         )
 
-    client.create_payload_index(
+    await client.create_payload_index(
         collection_name=COLLECTION_NAME,
         field_name="country_id",
         field_schema=IntegerIndexParams(
@@ -46,7 +71,12 @@ async def init_qdrant(session: AsyncSession):
     )
 
 
-async def populate_qdrant(session: AsyncSession):
+async def populate_qdrant(session: AsyncSession, overwrite: bool = False):
+    """Upserts every fragment as a point of `COLLECTION_NAME`.
+
+    Countries whose points all exist already are skipped, unless `overwrite`
+    is set (e.g. after the fragment embeddings were recomputed).
+    """
 
     d_repo = DocumentRepository(session)
     c_repo = CountryRepository(session)
@@ -60,8 +90,9 @@ async def populate_qdrant(session: AsyncSession):
         ids = [fragment.id for fragment in fragments]
         points = []
 
-        if len(get_points(client, COLLECTION_NAME, ids)) == len(ids):
-            continue
+        if not overwrite:
+            if len(await get_points(client, COLLECTION_NAME, ids)) == len(ids):
+                continue
 
         for fragment in fragments:
 
@@ -79,7 +110,7 @@ async def populate_qdrant(session: AsyncSession):
             points.append(point)
 
         if points:
-            client.upsert(collection_name=COLLECTION_NAME, points=points)
+            await client.upsert(collection_name=COLLECTION_NAME, points=points)
 
 
 def get_qdrant_client():
@@ -87,8 +118,8 @@ def get_qdrant_client():
     return client
 
 
-def close_qdrant_client():
+async def close_qdrant_client():
     """Closes the Qdrant client if it's open."""
     global client
     if client:
-        client.close()
+        await client.close()
@@ -0,0 +1,107 @@
+import logging
+from typing import List
+
+import numpy as np
+from qdrant_client.http.models import ScoredPoint
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import metrics
+import qdrant
+from db.models import DayCountry
+from db.repositories.document import FragmentRepository
+
+
+class FragmentIndex:
+    """Exact in-memory cosine index over the fragments of one country.
+
+    Vectors are kept L2-normalized in a contiguous float32 matrix, so a top-k
+    query is a single matrix-vector product.
+    """
+
+    def __init__(
+        self,
+        country_id: int,
+        ids: List[int],
+        texts: List[str],
+        embeddings: List[List[float]],
+    ):
+        self.country_id = country_id
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.texts = texts
+
+        if len(embeddings):
+            matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        else:
+            # A country without fragments; every search returns nothing.
+            matrix = np.empty((0, qdrant.EMBEDDING_SIZE), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query_vector: List[float], limit: int = 5) -> List[ScoredPoint]:
+        if not len(self):
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self.matrix @ query
+        if limit < len(scores):
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            ScoredPoint(
+                id=int(self.ids[i]),
+                version=0,
+                score=float(scores[i]),
+                payload={
+                    "country_id": self.country_id,
+                    "fragment_text": self.texts[i],
+                },
+            )
+            for i in top
+        ]
+
+
+# Index of today's country; replaced as a whole when the day rolls over.
+day_index: FragmentIndex | None = None
+
+
+def get_day_index(country_id: int) -> FragmentIndex | None:
+    """Returns the loaded index if it covers `country_id`, otherwise None."""
+    index = day_index
+    if index is None or index.country_id != country_id:
+        return None
+    return index
+
+
+async def build_fragment_index(session: AsyncSession, country_id: int) -> FragmentIndex:
+    fragments = await FragmentRepository(session).get_fragments_for_country(country_id)
+    return FragmentIndex(
+        country_id=country_id,
+        ids=[fragment.id for fragment in fragments],
+        texts=[fragment.text for fragment in fragments],
+        embeddings=[fragment.embedding for fragment in fragments],
+    )
+
+
+async def load_day_index(session: AsyncSession, day: DayCountry) -> FragmentIndex:
+    """Builds the index for `day` and swaps it in atomically."""
+    global day_index
+
+    with metrics.timed("local_index.load_ms"):
+        index = await build_fragment_index(session, day.country_id)
+
+    day_index = index
+    logging.info(
+        f"Loaded {len(index)} fragments of country {day.country_id} for {day.date}"
+    )
+    return index
@@ -1,24 +1,26 @@
-from typing import List, Tuple
+import logging
+from typing import Dict, List, Tuple
 
 from db.models import DayCountry, Fragment, Question
 from db.repositories.document import FragmentRepository
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.http.models import (
     FieldCondition,
     Filter,
     MatchValue,
-    GroupsResult,
-    PointGroup,
+    QueryResponse,
     ScoredPoint,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
+import metrics
 import qdrant
 
 from qdrant_client.models import PointStruct
 
+from . import local_index
 from .vectorize import get_embedding
 
 
@@ -31,60 +33,184 @@ def split_document(content: str) -> List[Document]:
     return fragments
 
 
-def get_points(client: QdrantClient, collection_name: str, ids: list[int]):
+async def get_points(client: AsyncQdrantClient, collection_name: str, ids: list[int]):
     try:
         # Try to get the point by its ID
-        points = client.retrieve(collection_name=collection_name, ids=ids)
+        with metrics.timed("qdrant.retrieve_ms"):
+            points = await client.retrieve(collection_name=collection_name, ids=ids)
         return points
     except UnexpectedResponse:
         return []
 
 
-def search_matches(
+async def search_matches(
     collection_name: str,
     query_vector: list,
     country_id: int = None,
     limit: int = 5,
 ) -> List[ScoredPoint]:
-    search_result: GroupsResult = qdrant.client.search_groups(
+    with metrics.timed("qdrant.search_ms"):
+        search_result: QueryResponse = await qdrant.client.query_points(
+            collection_name=collection_name,
+            query=query_vector,
+            query_filter=Filter(
+                must=[
+                    # Strict match for country_id
+                    FieldCondition(key="country_id", match=MatchValue(value=country_id))
+                ]
+            ),
+            limit=limit,
+            with_payload=True,
+        )
+    return search_result.points
+
+
+async def search_fragments(
+    collection_name: str,
+    query_vector: List[float],
+    country_id: int,
+    session: AsyncSession,
+    limit: int = 5,
+) -> List[ScoredPoint]:
+    """Top-k fragment search through the configured retrieval backend."""
+    if (
+        qdrant.RETRIEVAL_BACKEND == "local"
+        and collection_name == qdrant.COLLECTION_NAME
+    ):
+        index = local_index.get_day_index(country_id)
+        if index is not None:
+            metrics.incr("retrieval.local")
+            return index.search(query_vector, limit)
+
+    if qdrant.RETRIEVAL_BACKEND == "pgvector":
+        metrics.incr("retrieval.pgvector")
+        return await search_fragments_pgvector(query_vector, country_id, session, limit)
+
+    metrics.incr("retrieval.qdrant")
+    return await search_matches(
         collection_name=collection_name,
-        query_vector=query_vector,  # Use the query vector to search for similar vectors
-        group_by="country_id",  # Group results by country_id
-        group_size=limit,  # Return up to 5 points per group
-        limit=1,  # Limit to 3 groups (you can adjust as needed)
-        query_filter=Filter(
-            must=[
-                FieldCondition(
-                    key="country_id",
-                    match=MatchValue(value=country_id),  # Strict match for country_id
-                )
-            ]
-        ),
-        with_payload=True,
+        query_vector=query_vector,
+        country_id=country_id,
+        limit=limit,
     )
-    group, *_ = search_result.groups
-    return group.hits
 
 
-async def get_fragments_matching_question(
-    question: str, day: DayCountry, collection_name: str, session: AsyncSession
-) -> Tuple[list[Fragment], List[float]]:
-    query = question
-    query_vector = get_embedding(query, qdrant.EMBEDDING_MODEL)
-
-    points: List[ScoredPoint] = search_matches(
-        collection_name=collection_name,
-        query_vector=query_vector,
-        country_id=day.country_id,
+async def search_fragments_pgvector(
+    query_vector: List[float],
+    country_id: int,
+    session: AsyncSession,
+    limit: int = 5,
+) -> List[ScoredPoint]:
+    """Same as `search_matches`, but runs the cosine search in Postgres."""
+    rows = await FragmentRepository(session).search_similar(
+        query_vector, country_id, limit
     )
-    points.sort(key=lambda x: int(x.id))
-    f_repo = FragmentRepository(session)
-    fragments = []
-    for point in points:
-        fragment = await f_repo.get(int(point.id))
-        fragments.append(fragment)
+    return [
+        ScoredPoint(
+            id=fragment.id,
+            version=0,
+            score=1 - distance,
+            payload={"country_id": country_id, "fragment_text": fragment.text},
+        )
+        for fragment, distance in rows
+    ]
+
+
+async def find_cached_answer(
+    query_vector: List[float],
+    country_id: int,
+    threshold: float | None = None,
+) -> ScoredPoint | None:
+    """Returns the closest previously answered question about the same country.
+
+    The point is returned only if its cosine similarity reaches `threshold`
+    (defaults to `QUESTION_CACHE_THRESHOLD`), otherwise None.
+    """
+    if threshold is None:
+        threshold = qdrant.QUESTION_CACHE_THRESHOLD
+
+    if threshold > 1:
+        return None
+
+    with metrics.timed("qdrant.question_cache_ms"):
+        result = await qdrant.client.query_points(
+            collection_name=qdrant.QUESTIONS_COLLECTION_NAME,
+            query=query_vector,
+            query_filter=Filter(
+                must=[
+                    FieldCondition(key="country_id", match=MatchValue(value=country_id))
+                ]
+            ),
+            limit=1,
+            with_payload=True,
+        )
+    best = result.points[0] if result.points else None
+    score = best.score if best is not None else 0.0
+
+    if best is None or score < threshold:
+        metrics.incr("question_cache.miss")
+        metrics.observe("question_cache.miss_score", score)
+        logging.info(f"Question cache miss (country={country_id}, score={score:.4f})")
+        return None
+
+    metrics.incr("question_cache.hit")
+    metrics.observe("question_cache.hit_score", score)
+    logging.info(
+        f"Question cache hit (country={country_id}, score={score:.4f}, "
+        f"question_id={best.id}): {best.payload.get('question_text')}"
+    )
+    return best
+
 
-    return fragments, query_vector
+async def get_fragments_matching_question(
+    question: str,
+    day: DayCountry,
+    collection_name: str,
+    session: AsyncSession,
+    query_vector: List[float] | None = None,
+) -> Tuple[list[Fragment], Dict[int, float], List[float]]:
+    """Returns the top fragments best first, their scores and the question
+    vector."""
+    if query_vector is None:
+        query_vector = await get_embedding(
+            question, qdrant.EMBEDDING_MODEL, session
+        )
+
+    points = await search_fragments(
+        collection_name, query_vector, day.country_id, session
+    )
+    fragments = await load_fragments(points, session)
+    scores = {int(point.id): point.score for point in points}
+
+    return fragments, scores, query_vector
+
+
+async def load_fragments(
+    points: List[ScoredPoint],
+    session: AsyncSession,
+    from_payload: bool | None = None,
+) -> List[Fragment]:
+    """Returns the fragments behind `points`, in the same order.
+
+    With `from_payload` (default `FRAGMENTS_FROM_PAYLOAD`) the fragments are
+    built from the `fragment_text` stored in the point payload without touching
+    Postgres. Otherwise, or if any payload lacks the text, they are loaded with
+    a single IN query.
+    """
+    if from_payload is None:
+        from_payload = qdrant.FRAGMENTS_FROM_PAYLOAD
+
+    if from_payload and all(
+        point.payload and "fragment_text" in point.payload for point in points
+    ):
+        return [
+            Fragment(id=int(point.id), text=point.payload["fragment_text"])
+            for point in points
+        ]
+
+    return await FragmentRepository(session).get_many(
+        [int(point.id) for point in points]
+    )
 
 
 async def add_question_to_qdrant(
@@ -100,4 +226,7 @@ async def add_question_to_qdrant(
             "explonation": question.explanation,
         },
     )
-    qdrant.client.upsert(collection_name="questions", points=[point])
+    with metrics.timed("qdrant.upsert_ms"):
+        await qdrant.client.upsert(
+            collection_name=qdrant.QUESTIONS_COLLECTION_NAME, points=[point]
+        )
@@ -1,8 +1,189 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
 from typing import List
-from openai import OpenAI
 
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def get_embedding(text: str, model: str) -> List[float]:
-    client = OpenAI()
-    text = text.replace("\n", " ")
-    return client.embeddings.create(input=[text], model=model).data[0].embedding
+import metrics
+from cache import LRUCache
+from db.repositories.embedding import EmbeddingCacheRepository
+from llm import get_llm_client
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "5000"))
+EMBEDDING_CACHE_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "200000"))
+
+# The embeddings API accepts at most 2048 inputs and ~300k tokens per request.
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "512"))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "250000"))
+EMBEDDING_BATCH_CONCURRENCY = int(os.getenv("EMBEDDING_BATCH_CONCURRENCY", "4"))
+EMBEDDING_BATCH_RETRIES = int(os.getenv("EMBEDDING_BATCH_RETRIES", "5"))
+
+# Errors worth retrying a batch for; anything else (e.g. a 400) fails at once.
+RETRYABLE_ERRORS = (
+    RateLimitError,
+    APITimeoutError,
+    APIConnectionError,
+    InternalServerError,
+)
+
+embeddings_cache = LRUCache(
+    maxsize=EMBEDDING_CACHE_SIZE, name="embedding_cache.memory"
+)
+
+# Uses of `embedding_cache` rows since the last flush, (model, text_hash) ->
+# count. Written to the table by `flush_embedding_hits` every minute.
+embedding_hits: dict[tuple[str, str], int] = {}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf8")).hexdigest()
+
+
+async def get_embedding(
+    text: str, model: str, session: AsyncSession | None = None
+) -> List[float]:
+    """Returns the embedding of `text`, served from cache when possible.
+
+    Lookups go through the in-process LRU, then the `embedding_cache` table
+    (if a session is given) and only then the embeddings API.
+    """
+    key = (model, text_hash(text))
+
+    embedding = embeddings_cache.get(key)
+    if embedding is None and session is not None:
+        embedding = await EmbeddingCacheRepository(session).get(*key)
+        metrics.incr(
+            "embedding_cache.db.hit" if embedding else "embedding_cache.db.miss"
+        )
+        if embedding is not None:
+            embeddings_cache.set(key, embedding)
+
+    if embedding is not None:
+        metrics.incr("embedding_cache.hit")
+        embedding_hits[key] = embedding_hits.get(key, 0) + 1
+        return embedding
+
+    metrics.incr("embedding_cache.miss")
+
+    client = get_llm_client()
+    response = await client.embeddings.create(input=[normalize_text(text)], model=model)
+    embedding = response.data[0].embedding
+
+    embeddings_cache.set(key, embedding)
+    if session is not None:
+        await EmbeddingCacheRepository(session).add(*key, embedding)
+
+    return embedding
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 3 + 1
+
+
+def make_batches(
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+) -> List[List[int]]:
+    """Splits text indices into batches within the request-size limits."""
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    tokens = 0
+
+    for i, text in enumerate(texts):
+        text_tokens = estimate_tokens(text)
+        if batch and (len(batch) >= batch_size or tokens + text_tokens > max_tokens):
+            batches.append(batch)
+            batch, tokens = [], 0
+
+        batch.append(i)
+        tokens += text_tokens
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+async def _embed_batch(
+    texts: List[str], model: str, semaphore: asyncio.Semaphore
+) -> List[List[float]]:
+    client = get_llm_client()
+
+    for attempt in range(EMBEDDING_BATCH_RETRIES + 1):
+        try:
+            async with semaphore:
+                response = await client.embeddings.create(input=texts, model=model)
+            break
+        except RETRYABLE_ERRORS as ex:
+            if attempt == EMBEDDING_BATCH_RETRIES:
+                raise ex
+            delay = 2**attempt
+            logging.warning(
+                f"Embedding batch of {len(texts)} failed ({ex}), retrying in {delay}s"
+            )
+            await asyncio.sleep(delay)
+
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+async def get_embeddings(
+    texts: List[str],
+    model: str,
+    concurrency: int = EMBEDDING_BATCH_CONCURRENCY,
+) -> List[List[float]]:
+    """Embeds many texts with batched requests, in input order.
+
+    Up to `concurrency` batches are in flight at once; each batch is retried
+    on its own with exponential backoff. If a batch fails for good, the
+    remaining batches are cancelled.
+    """
+    texts = [normalize_text(text) for text in texts]
+    semaphore = asyncio.Semaphore(concurrency)
+    batches = make_batches(texts)
+
+    tasks = [
+        asyncio.create_task(_embed_batch([texts[i] for i in batch], model, semaphore))
+        for batch in batches
+    ]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    embeddings: List[List[float]] = [None] * len(texts)
+    for batch, batch_embeddings in zip(batches, results):
+        for i, embedding in zip(batch, batch_embeddings):
+            embeddings[i] = embedding
+
+    return embeddings
+
+
+async def flush_embedding_hits(session: AsyncSession) -> int:
+    """Writes the recorded cache uses to `embedding_cache` in one UPDATE."""
+    global embedding_hits
+    hits, embedding_hits = embedding_hits, {}
+    return await EmbeddingCacheRepository(session).record_hits(hits)
+
+
+async def prune_embedding_cache(session: AsyncSession) -> int:
+    """Trims the `embedding_cache` table to `EMBEDDING_CACHE_MAX_ROWS` rows."""
+    await flush_embedding_hits(session)
+    return await EmbeddingCacheRepository(session).prune(EMBEDDING_CACHE_MAX_ROWS)
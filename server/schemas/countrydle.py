@@ -153,6 +153,8 @@ class CountrydleEndStateResponse(BaseModel):
 class CountrydleHistory(BaseModel):
     countries_count: List[CountryCount]
     daily_countries: List[DayCountryDisplay]
+    # Cursor of the next page of `daily_countries`, None on the last one.
+    next: str | None = None
 
     class Config:
         from_attributes = True
@@ -164,6 +166,15 @@ class LeaderboardEntry(BaseModel):
     points: int
     streak: int
     wins: int
+    # Pass as `after` to get the entries ranked below this one.
+    cursor: str
+
+
+class LeaderboardRank(LeaderboardEntry):
+    rank: int
+    # The user is below the exactly counted top of the leaderboard and `rank`
+    # is its limit + 1.
+    rank_capped: bool = False
 
 
 class UserState(BaseModel):
@@ -192,6 +203,16 @@ class UserStatistics(BaseModel):
     guesses_correct: int
     guesses_incorrect: int
     history: List[UserState]
+    history_next: str | None = None
 
     class Config:
         from_attributes = True
+
+
+class UserHistoryEntry(UserState):
+    id: int
+
+
+class UserHistoryPage(BaseModel):
+    items: List[UserHistoryEntry]
+    next: str | None = None
@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+import qdrant.vectorize as vectorize
+
+
+class FakeEmbeddings:
+    """Stands in for `client.embeddings`; `fail` decides per call what to raise."""
+
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def create(self, input, model):
+        self.calls += 1
+        error = self.fail(self.calls, input) if self.fail else None
+        if error is not None:
+            raise error
+        try:
+            await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text))])
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=data)
+
+
+def status_error(cls, code):
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    response = httpx.Response(code, request=request)
+    return cls("error", response=response, body=None)
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    fake = FakeEmbeddings()
+    client = SimpleNamespace(embeddings=fake)
+    monkeypatch.setattr(vectorize, "get_llm_client", lambda: client)
+    # One text per batch, so every text is its own request.
+    monkeypatch.setattr(
+        vectorize, "make_batches", lambda texts: [[i] for i in range(len(texts))]
+    )
+    return fake
+
+
+def test_keeps_input_order(embeddings):
+    result = asyncio.run(vectorize.get_embeddings(["a", "bbb", "cc"], "model"))
+
+    assert result == [[1.0], [3.0], [2.0]]
+
+
+def test_retries_rate_limits(embeddings):
+    embeddings.fail = lambda call, _: (
+        status_error(openai.RateLimitError, 429) if call == 1 else None
+    )
+
+    assert asyncio.run(vectorize.get_embeddings(["a"], "model")) == [[1.0]]
+    assert embeddings.calls == 2
+
+
+def test_does_not_retry_client_errors(embeddings):
+    embeddings.fail = lambda call, _: status_error(openai.BadRequestError, 400)
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(vectorize.get_embeddings(["a"], "model"))
+    assert embeddings.calls == 1
+
+
+def test_failed_batch_cancels_the_others(embeddings):
+    embeddings.fail = lambda call, texts: (
+        status_error(openai.BadRequestError, 400) if texts == ["bad"] else None
+    )
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(vectorize.get_embeddings(["a", "bad", "b", "c"], "model"))
+    assert embeddings.cancelled == 3
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+from qdrant_client.http.models import ScoredPoint
+
+import qdrant.utils as qutils
+from db.models import Fragment
+from qdrant.utils import get_fragments_matching_question
+
+# Search results come best first; the ids are deliberately out of order.
+POINTS = [(42, 0.91), (7, 0.85), (19, 0.60)]
+
+
+def scored_points():
+    return [
+        ScoredPoint(
+            id=id, version=0, score=score, payload={"fragment_text": f"text {id}"}
+        )
+        for id, score in POINTS
+    ]
+
+
+@pytest.fixture(autouse=True)
+def search(monkeypatch):
+    async def search_fragments(collection_name, query_vector, country_id, session):
+        return scored_points()
+
+    monkeypatch.setattr(qutils, "search_fragments", search_fragments)
+
+
+class FakeFragmentRepository:
+    def __init__(self, session):
+        pass
+
+    async def get_many(self, fids):
+        return [Fragment(id=fid, text=f"text {fid}") for fid in fids]
+
+
+@pytest.mark.parametrize("from_payload", [True, False])
+def test_fragments_keep_score_order(monkeypatch, from_payload):
+    monkeypatch.setattr(qutils.qdrant, "FRAGMENTS_FROM_PAYLOAD", from_payload)
+    monkeypatch.setattr(qutils, "FragmentRepository", FakeFragmentRepository)
+    day = type("Day", (), {"country_id": 1})()
+
+    fragments, scores, _ = asyncio.run(
+        get_fragments_matching_question(
+            "Is it in Europe?", day, "fragments", None, query_vector=[0.1]
+        )
+    )
+
+    assert [fragment.id for fragment in fragments] == [42, 7, 19]
+    assert scores == dict(POINTS)
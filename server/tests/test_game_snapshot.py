@@ -0,0 +1,109 @@
+import asyncio
+import os
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from db.models import DayCountry, Guess, User
+from db.repositories.countrydle import CountrydleStateRepository
+
+# A scratch Postgres database with the schema, e.g. the one docker compose
+# starts. Everything the tests write is rolled back.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+class Result:
+    def __init__(self, row=None, scalar=None):
+        self.row = row
+        self.scalar = scalar
+
+    def one(self):
+        return self.row
+
+    def scalars(self):
+        return SimpleNamespace(first=lambda: self.scalar, one=lambda: self.scalar)
+
+
+class RecordingSession:
+    """Records the statements; answers each with the next queued result."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+def test_snapshot_is_a_single_select():
+    session = RecordingSession(Result(row=({"id": 3}, [], [])))
+    repository = CountrydleStateRepository(session)
+
+    asyncio.run(
+        repository.get_game_snapshot(SimpleNamespace(id=1), SimpleNamespace(id=2))
+    )
+
+    assert len(session.statements) == 1
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert sql.lstrip().startswith("SELECT")
+    assert ";" not in sql
+    for table in ("countrydle_states", "guesses", "questions"):
+        assert f"FROM {table}" in sql
+
+
+@pytest.mark.skipif(TEST_DATABASE_URL is None, reason="TEST_DATABASE_URL not set")
+def test_snapshot_round_trips_against_postgres():
+    async def run():
+        engine = create_async_engine(TEST_DATABASE_URL)
+        statements = []
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def count(conn, cursor, statement, *args):
+            if statement.split()[0] in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+                statements.append(statement)
+
+        async with engine.connect() as conn:
+            await conn.begin()
+            session = AsyncSession(
+                bind=conn,
+                expire_on_commit=False,
+                join_transaction_mode="create_savepoint",
+            )
+            user = User(username="snapshot-test", email="snapshot@test.example")
+            day = DayCountry(date=date(1999, 1, 1))
+            session.add_all([user, day])
+            await session.flush()
+            session.add(Guess(user_id=user.id, day_id=day.id, guess="Peru"))
+            await session.flush()
+            repository = CountrydleStateRepository(session)
+
+            statements.clear()
+            state, guesses, _ = await repository.get_game_snapshot(user, day)
+            missing = len(statements)
+
+            statements.clear()
+            again, guesses_again, _ = await repository.get_game_snapshot(user, day)
+            existing = len(statements)
+
+            await conn.rollback()
+        await engine.dispose()
+
+        return missing, existing, state, again, guesses_again
+
+    missing, existing, state, again, guesses = asyncio.run(run())
+
+    assert missing == 2
+    assert existing == 1
+    assert again["id"] == state.id
+    assert [guess["guess"] for guess in guesses] == ["Peru"]
@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from utils import google
+
+KID = "test-key"
+
+
+@pytest.fixture(scope="module")
+def private_key() -> bytes:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+@pytest.fixture(autouse=True)
+def key_set(private_key):
+    public_key = jwk.construct(private_key, "RS256").public_key().to_dict()
+    google.load_jwks({"keys": [{**public_key, "kid": KID, "use": "sig"}]})
+    yield
+    google.load_jwks({"keys": []}, max_age=0)
+
+
+def make_token(private_key: bytes, kid: str = KID, **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": google.GOOGLE_CLIENT_ID,
+        "sub": "1234567890",
+        "email": "player@example.com",
+        "email_verified": True,
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def verify(token: str) -> dict:
+    return asyncio.run(google.verify_google_token_locally(token))
+
+
+def test_valid_token(private_key):
+    claims = verify(make_token(private_key))
+
+    assert claims["email"] == "player@example.com"
+    assert claims["aud"] == google.GOOGLE_CLIENT_ID
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"aud": "someone-else"},
+        {"iss": "https://evil.example.com"},
+        {"exp": int(time.time()) - 60},
+    ],
+    ids=["wrong aud", "wrong iss", "expired"],
+)
+def test_rejected_claims(private_key, claims):
+    with pytest.raises(HTTPException) as ex:
+        verify(make_token(private_key, **claims))
+
+    assert ex.value.status_code == 400
+    assert ex.value.detail == "Token verification failed"
+
+
+def test_unverified_email(private_key):
+    with pytest.raises(HTTPException) as ex:
+        verify(make_token(private_key, email_verified=False))
+
+    assert ex.value.detail == "Email is not verified!"
+
+
+def test_wrong_signature(private_key):
+    other = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    other_pem = other.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+    with pytest.raises(HTTPException):
+        verify(make_token(other_pem))
+
+
+def test_unknown_key_is_not_refetched_too_often(private_key, monkeypatch):
+    async def fail():
+        raise AssertionError("the key set was loaded just now")
+
+    monkeypatch.setattr(google, "_fetch_jwks", fail)
+
+    with pytest.raises(HTTPException):
+        verify(make_token(private_key, kid="rotated-key"))
+
+
+def test_concurrent_misses_fetch_once(private_key, monkeypatch):
+    keys = dict(google.jwks)
+    google.load_jwks({"keys": []}, max_age=0)
+    fetches = 0
+
+    async def fetch():
+        nonlocal fetches
+        fetches += 1
+        await asyncio.sleep(0.01)
+        google.load_jwks({"keys": list(keys.values())})
+
+    monkeypatch.setattr(google, "_fetch_jwks", fetch)
+
+    async def verify_many():
+        token = make_token(private_key)
+        return await asyncio.gather(
+            *(google.verify_google_token_locally(token) for _ in range(10))
+        )
+
+    assert len(asyncio.run(verify_many())) == 10
+    assert fetches == 1
@@ -0,0 +1,27 @@
+import numpy as np
+
+import qdrant
+from qdrant.local_index import FragmentIndex
+
+
+def test_search_ranks_by_cosine_similarity():
+    index = FragmentIndex(
+        country_id=7,
+        ids=[10, 11, 12],
+        texts=["north", "east", "north-east"],
+        embeddings=[[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]],
+    )
+
+    points = index.search([3.0, 0.0], limit=2)
+
+    assert [point.id for point in points] == [10, 12]
+    assert np.isclose(points[0].score, 1.0)
+    assert points[1].payload == {"country_id": 7, "fragment_text": "north-east"}
+
+
+def test_country_without_fragments():
+    index = FragmentIndex(country_id=7, ids=[], texts=[], embeddings=[])
+
+    assert len(index) == 0
+    assert index.matrix.shape == (0, qdrant.EMBEDDING_SIZE)
+    assert index.search([1.0] * qdrant.EMBEDDING_SIZE) == []
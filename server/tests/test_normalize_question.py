@@ -0,0 +1,23 @@
+from countrydle.utils import normalize_question
+
+
+def test_folds_case_punctuation_and_subject():
+    assert normalize_question("Is this country in Europe?") == "is it in europe"
+    assert normalize_question("in   EUROPE!!") == "is it in europe"
+    assert normalize_question("Isn't it an island?") == "is not it an island"
+
+
+def test_keeps_comparison_symbols():
+    greater = normalize_question("Is the population > 1M?")
+    less = normalize_question("Is the population < 1M?")
+
+    assert greater != less
+    assert greater == normalize_question("is the population>1M")
+
+
+def test_keeps_numbers_intact():
+    assert normalize_question("Over 1.5 million people?") != normalize_question(
+        "Over 15 million people?"
+    )
+    assert "-5" in normalize_question("Is it ever below -5°C?")
+    assert normalize_question("Is it south-east Asian?") == "is it south east asian"
@@ -0,0 +1,59 @@
+import asyncio
+
+import countrydle.crud as crud
+
+
+class RecordingSession:
+    def __init__(self):
+        self.added = []
+        self.commits = 0
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def add_all(self, objs):
+        self.added.extend(objs)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def test_ingests_countries_with_one_batched_embedding_call(tmp_path, monkeypatch):
+    (tmp_path / "data" / "pages").mkdir(parents=True)
+    (tmp_path / "data" / "countries.csv").write_text(
+        "name,official_name,wiki_page\n"
+        "Peru,Republic of Peru,https://en.wikipedia.org/wiki/Peru\n"
+        "Chile,Republic of Chile,https://en.wikipedia.org/wiki/Chile\n"
+    )
+    for name in ("Peru", "Chile"):
+        (tmp_path / "data" / "pages" / f"{name}.md").write_text(
+            f"# {name}\n\n{name} is a country in South America."
+        )
+    monkeypatch.chdir(tmp_path)
+
+    async def no_countries(self):
+        return []
+
+    calls = []
+
+    async def get_embeddings(texts, model):
+        calls.append(texts)
+        return [[float(i)] for i in range(len(texts))]
+
+    monkeypatch.setattr(crud.CountryRepository, "get_all_countries", no_countries)
+    monkeypatch.setattr(crud, "get_embeddings", get_embeddings)
+
+    session = RecordingSession()
+    asyncio.run(crud.populate_countries(session))
+
+    countries = [obj for obj in session.added if isinstance(obj, crud.Country)]
+    fragments = [obj for obj in session.added if isinstance(obj, crud.Fragment)]
+    assert [country.name for country in countries] == ["Peru", "Chile"]
+    assert len(calls) == 1
+    assert [fragment.text for fragment in fragments] == calls[0]
+    assert [fragment.embedding for fragment in fragments] == [
+        [float(i)] for i in range(len(calls[0]))
+    ]
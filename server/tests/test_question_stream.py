@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import countrydle
+from schemas.countrydle import QuestionEnhanced
+
+STATE = SimpleNamespace(id=1)
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def released(monkeypatch):
+    released = []
+
+    class FakeStateRepository:
+        def __init__(self, session):
+            pass
+
+        async def release_question(self, state):
+            released.append(state)
+
+    monkeypatch.setattr(countrydle, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(countrydle, "CountrydleStateRepository", FakeStateRepository)
+    return released
+
+
+def stream(monkeypatch, answer):
+    monkeypatch.setattr(countrydle.gutils, "stream_answer_question", answer)
+    return countrydle.question_events("Is it in Europe?", None, None, STATE)
+
+
+async def validated_then(error):
+    yield "validation", QuestionEnhanced(
+        original_question="Is it in Europe?",
+        question="Is it in Europe?",
+        valid=True,
+        explanation=None,
+    )
+    await asyncio.sleep(0)
+    raise error
+
+
+def test_error_releases_slot_and_sends_event(monkeypatch, released):
+    async def answer(*args):
+        async for event in validated_then(RuntimeError("model is down")):
+            yield event
+
+    async def collect():
+        return [event async for event in stream(monkeypatch, answer)]
+
+    events = asyncio.run(collect())
+
+    assert released == [STATE]
+    assert events[-1].startswith("event: error")
+
+
+def test_error_event_is_sent_when_release_fails(monkeypatch, released):
+    async def answer(*args):
+        async for event in validated_then(RuntimeError("model is down")):
+            yield event
+
+    async def broken_release(self, state):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(
+        countrydle.CountrydleStateRepository, "release_question", broken_release
+    )
+
+    async def collect():
+        return [event async for event in stream(monkeypatch, answer)]
+
+    assert asyncio.run(collect())[-1].startswith("event: error")
+
+
+def test_disconnect_releases_slot(monkeypatch, released):
+    async def answer(*args):
+        async for event in validated_then(AssertionError("never reached")):
+            yield event
+
+    async def disconnect_after_first_event():
+        events = stream(monkeypatch, answer)
+        await events.__anext__()
+        await events.aclose()
+
+    asyncio.run(disconnect_after_first_event())
+
+    assert released == [STATE]
+
+
+def test_cancelled_stream_releases_slot(monkeypatch, released):
+    async def answer(*args):
+        yield "validation", QuestionEnhanced(
+            original_question="Is it in Europe?",
+            question="Is it in Europe?",
+            valid=True,
+            explanation=None,
+        )
+        await asyncio.sleep(10)
+
+    async def cancel_while_answering():
+        async def consume():
+            async for _ in stream(monkeypatch, answer):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_answering())
+
+    assert released == [STATE]
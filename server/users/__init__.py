@@ -8,7 +8,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.repositories.user import UserRepository
 
-from .utils import create_access_token, get_current_user, send_verification_email
+from .utils import (
+    create_user_access_token,
+    get_current_identity,
+    get_current_user,
+    send_verification_email,
+)
 
 load_dotenv()
 router = APIRouter()
@@ -16,7 +21,7 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserDisplay)
 async def read_users_me(
-    user: User = Depends(get_current_user), session: AsyncSession = Depends(get_db)
+    user: User = Depends(get_current_identity), session: AsyncSession = Depends(get_db)
 ):
     return user
 
@@ -80,7 +85,7 @@ async def change_username(
             "message": "Account updated successfully! You will be logged out!",
         }
 
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_user_access_token(user)
 
     response.set_cookie(
         key="access_token",
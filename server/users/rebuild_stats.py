@@ -0,0 +1,30 @@
+"""Rebuilds the user_stats rollup from the questions, guesses and games tables.
+
+The migration fills the table once; run this if the counters ever drift.
+Every user's row is overwritten with totals recomputed from history.
+
+Usage (from the server directory, with the usual .env):
+
+    python -m users.rebuild_stats
+"""
+
+import asyncio
+import logging
+
+from db import AsyncSessionLocal
+from db.repositories.user import UserRepository
+
+
+async def rebuild_user_stats():
+    async with AsyncSessionLocal() as session:
+        rows = await UserRepository(session).rebuild_user_stats()
+        logging.info(f"Rebuilt stats of {rows} users.")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(rebuild_user_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,11 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 
+# Lets read-only endpoints trust the identity carried in the access token
+# instead of loading the user. A changed or unverified account stays valid
+# for them until the token expires.
+TRUST_TOKEN_IDENTITY = os.getenv("TRUST_TOKEN_IDENTITY", "false").lower() == "true"
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 
@@ -28,7 +33,14 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def verify_access_token(token: str):
+def create_user_access_token(user: User):
+    """Access token for a verified `user` that also carries its identity."""
+    return create_access_token(
+        data={"sub": user.username, "uid": user.id, "email": user.email}
+    )
+
+
+def decode_access_token(token: str) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -44,7 +56,11 @@ def verify_access_token(token: str):
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    return username
+    return payload
+
+
+def verify_access_token(token: str):
+    return decode_access_token(token)["sub"]
 
 
 def create_verification_token(email: str):
@@ -72,7 +88,7 @@ async def get_current_user(
     access_token: str = Cookie(None), session: AsyncSession = Depends(get_db)
 ) -> User:
     username = verify_access_token(access_token)
-    user = await UserRepository(session).get_veified_user_by_username(username)
+    user = await UserRepository(session).get_cached_verified_user(username)
 
     if not user:
         raise HTTPException(
@@ -83,6 +99,26 @@ async def get_current_user(
     return user
 
 
+async def get_current_identity(
+    access_token: str = Cookie(None), session: AsyncSession = Depends(get_db)
+) -> User:
+    """`get_current_user` for read-only endpoints.
+
+    With TRUST_TOKEN_IDENTITY the user is built from the token claims without
+    touching the database. The returned user is not attached to a session.
+    """
+    payload = decode_access_token(access_token)
+    if TRUST_TOKEN_IDENTITY and "uid" in payload:
+        return User(
+            id=payload["uid"],
+            username=payload["sub"],
+            email=payload.get("email"),
+            verified=True,
+        )
+
+    return await get_current_user(access_token, session)
+
+
 async def send_verification_email(
     user: User, background_tasks: BackgroundTasks
 ) -> None:
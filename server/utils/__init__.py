@@ -1,5 +1,6 @@
 from datetime import date, timedelta
 import logging
+import os
 
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -7,18 +8,27 @@ from apscheduler.triggers.cron import CronTrigger
 from db import AsyncSessionLocal
 from db.base import Base
 from db.models import *  # noqa: F403
-from db.repositories.countrydle import CountrydleRepository, CountrydleStateRepository
+from db.repositories.countrydle import (
+    CountrydleRepository,
+    invalidate_today_country,
+)
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+import metrics
+from cache.responses import bump_version
+from countrydle.day_context import load_day_context
 from db.repositories.user import UserRepository
+from qdrant.vectorize import flush_embedding_hits, prune_embedding_cache
+from utils.google import refresh_jwks
+
+# Minutes between two logs of the metrics (cache hit rates and the rest).
+METRICS_LOG_INTERVAL = int(os.getenv("METRICS_LOG_INTERVAL", "5"))
 
 
 async def check_streaks():
     async with AsyncSessionLocal() as session:
         u_repo = UserRepository(session)
-        cs_repo = CountrydleStateRepository(session)
 
-        users = await u_repo.get_all_verified_users()
         yesterday = date.today() - timedelta(days=1)
         dc_yesterday = await CountrydleRepository(session).get_day_country_by_date(
             yesterday
@@ -28,19 +38,9 @@ async def check_streaks():
             logging.error(f"DayCountry for {yesterday} not found.")
             return
 
-        for user in users:
-            points = await u_repo.get_user_points(user.id)
-            if not points:
-                points = await u_repo.add_user_points(user.id)
-
-            yesterday_state = await cs_repo.get_player_countrydle_state(
-                user, dc_yesterday
-            )
-
-            if yesterday_state is None or not yesterday_state.is_game_over:
-                points.streak = 0
-
-            await session.commit()
+        broken = await u_repo.get_broken_streaks(dc_yesterday.id)
+        await u_repo.reset_streaks(broken)
+        logging.info(f"Reset {len(broken)} streaks.")
 
 
 async def generate_day_countries():
@@ -56,7 +56,32 @@ async def generate_day_countries():
             print(f"Generating country for {day_date}")
             await c_repo.generate_new_day_country(day_date)
 
+        # Re-read (and re-cache) today's country now that the days may have changed.
+        invalidate_today_country()
+        bump_version("day")
+        today = await c_repo.get_today_country()
+        if today is not None:
+            await load_day_context(session, today)
+
+
+async def flush_embeddings():
+    try:
+        async with AsyncSessionLocal() as session:
+            await flush_embedding_hits(session)
+    except Exception as e:
+        logging.warning(f"Recording embedding cache hits failed: {e}")
+
+
+async def prune_embeddings():
+    async with AsyncSessionLocal() as session:
+        removed = await prune_embedding_cache(session)
+        logging.info(f"Pruned {removed} cached embeddings.")
+
 
 scheduler = AsyncIOScheduler()
 scheduler.add_job(generate_day_countries, CronTrigger(hour=0, minute=0))
 scheduler.add_job(check_streaks, CronTrigger(hour=0, minute=0))
+scheduler.add_job(flush_embeddings, CronTrigger(minute="*"))
+scheduler.add_job(prune_embeddings, CronTrigger(hour=3, minute=0))
+scheduler.add_job(refresh_jwks, CronTrigger(minute=0))
+scheduler.add_job(metrics.log_snapshot, CronTrigger(minute=f"*/{METRICS_LOG_INTERVAL}"))
@@ -3,11 +3,14 @@ import logging
 from contextlib import asynccontextmanager
 
 import users.crud as ucrud
+from countrydle.aliases import get_alias_index
 from countrydle.crud import populate_countries
 from db import AsyncSessionLocal, get_engine
 from db.models import *  # noqa: F403
 from db.base import Base
 from fastapi import FastAPI
+from llm import close_llm_client
+from passwords import shutdown_password_executor
 from qdrant import close_qdrant_client, init_qdrant
 from sqlalchemy.ext.asyncio import AsyncEngine
 import utils
@@ -29,6 +32,7 @@ async def lifespan(app: FastAPI):
         async with AsyncSessionLocal() as session:
             await ucrud.add_base_permissions(session)
             await populate_countries(session)
+            await get_alias_index(session)
             await init_qdrant(session)
 
         await utils.generate_day_countries()
@@ -46,7 +50,10 @@ async def lifespan(app: FastAPI):
         try:
             logging.info("Shutting down application...")
             utils.scheduler.shutdown(wait=True)
-            close_qdrant_client()
+            await utils.flush_embeddings()
+            await close_qdrant_client()
+            await close_llm_client()
+            shutdown_password_executor()
             await engine.dispose()
             logging.info("Application shutdown complete.")
         except Exception as e:
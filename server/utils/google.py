@@ -1,35 +1,152 @@
+import asyncio
+import logging
+import os
+import re
+import time
 
-
-
+import httpx
 from dotenv import load_dotenv
 from fastapi import HTTPException
-from jose import JWTError
+from jose import JWTError, jwt
+
+import metrics
+
 load_dotenv()
-import os
-import requests
 
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_OAUTH2_URL = "https://oauth2.googleapis.com/tokeninfo?id_token="
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Verify ID tokens against Google's public keys instead of calling tokeninfo.
+GOOGLE_VERIFY_LOCALLY = os.getenv("GOOGLE_VERIFY_LOCALLY", "true").lower() == "true"
+# Used when the certs response has no Cache-Control max-age.
+GOOGLE_JWKS_MAX_AGE = int(os.getenv("GOOGLE_JWKS_MAX_AGE", "3600"))
+GOOGLE_JWKS_TIMEOUT = float(os.getenv("GOOGLE_JWKS_TIMEOUT", "5"))
+# Unknown key ids refetch the key set (keys rotate), at most this often.
+GOOGLE_JWKS_MIN_REFRESH = int(os.getenv("GOOGLE_JWKS_MIN_REFRESH", "60"))
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+# Google's signing keys by key id, and when they have to be fetched again.
+jwks: dict[str, dict] = {}
+jwks_loaded_at = float("-inf")
+jwks_expires_at = 0.0
+# Concurrent cache misses wait for one fetch instead of each fetching.
+_jwks_lock = asyncio.Lock()
+
+
+def load_jwks(key_set: dict, max_age: int = GOOGLE_JWKS_MAX_AGE):
+    """Replaces the cached signing keys with `key_set` ({"keys": [...]})."""
+    global jwks, jwks_loaded_at, jwks_expires_at
+    jwks = {key["kid"]: key for key in key_set.get("keys", [])}
+    jwks_loaded_at = time.monotonic()
+    jwks_expires_at = jwks_loaded_at + max_age
+
+
+async def _fetch_jwks():
+    async with httpx.AsyncClient(timeout=GOOGLE_JWKS_TIMEOUT) as client:
+        response = await client.get(GOOGLE_CERTS_URL)
+        response.raise_for_status()
+
+    match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+    load_jwks(response.json(), int(match.group(1)) if match else GOOGLE_JWKS_MAX_AGE)
+    metrics.incr("google_jwks.refresh")
+    logging.info(f"Loaded {len(jwks)} Google signing keys.")
+
+
+async def refresh_jwks():
+    async with _jwks_lock:
+        await _fetch_jwks()
+
+
+def _jwks_stale(kid: str) -> bool:
+    now = time.monotonic()
+    return now >= jwks_expires_at or (
+        kid not in jwks and now - jwks_loaded_at >= GOOGLE_JWKS_MIN_REFRESH
+    )
+
+
+async def get_signing_key(kid: str) -> dict | None:
+    """Returns the key `kid`, refetching the key set if it's stale or unknown."""
+    if _jwks_stale(kid):
+        async with _jwks_lock:
+            # Another request may have refetched while this one waited.
+            if _jwks_stale(kid):
+                await _fetch_jwks()
+    return jwks.get(kid)
+
+
+def decode_google_token(token: str, key: dict, client_id: str | None = None) -> dict:
+    """Checks the signature, audience, issuer and expiry of an ID token.
+
+    Raises JWTError if any of them is wrong.
+    """
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[key.get("alg", "RS256")],
+        audience=client_id or GOOGLE_CLIENT_ID,
+        issuer=GOOGLE_ISSUERS,
+        options={"verify_at_hash": False},
+    )
+
+
+def check_token_info(token_info: dict, client_id: str | None = None) -> dict:
+    # Check if the token was issued to your app's client
+    if token_info["aud"] != (client_id or GOOGLE_CLIENT_ID):
+        raise HTTPException(status_code=400, detail="Token not issued for this app!")
+
+    # tokeninfo returns "true"/"false", the ID token itself a boolean
+    if str(token_info.get("email_verified")).lower() != "true":
+        raise HTTPException(status_code=400, detail="Email is not verified!")
+
+    return token_info
+
+
+async def verify_google_token_locally(token: str) -> dict:
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except JWTError:
+        raise HTTPException(status_code=400, detail="Invalid Google Token")
+
+    key = await get_signing_key(kid) if kid else None
+    if key is None:
+        raise HTTPException(status_code=400, detail="Invalid Google Token")
 
-def verify_google_token(token: str):
     try:
-        # Call Google's OAuth2 tokeninfo endpoint to verify the token
-        response = requests.get(f"{GOOGLE_OAUTH2_URL}{token}")
-        if response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Invalid Google Token")
-        
-        token_info = response.json()
-
-        # Check if the token was issued to your app's client
-        if token_info["aud"] != GOOGLE_CLIENT_ID:
-            raise HTTPException(status_code=400, detail="Token not issued for this app!")
-        
-        
-        if not token_info["email_verified"]:
-            raise HTTPException(status_code=400, detail="Email is not verified!")
-
-        return token_info
-
-    except JWTError as e:
-        raise HTTPException(status_code=400, detail="Token verification failed")
\ No newline at end of file
+        token_info = decode_google_token(token, key)
+    except JWTError:
+        raise HTTPException(status_code=400, detail="Token verification failed")
+
+    return check_token_info(token_info)
+
+
+async def verify_google_token_remote(token: str) -> dict:
+    # Call Google's OAuth2 tokeninfo endpoint to verify the token
+    async with httpx.AsyncClient(timeout=GOOGLE_JWKS_TIMEOUT) as client:
+        response = await client.get(f"{GOOGLE_OAUTH2_URL}{token}")
+
+    if response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Invalid Google Token")
+
+    return check_token_info(response.json())
+
+
+async def verify_google_token(token: str) -> dict:
+    """Verifies a Google ID token and returns its claims.
+
+    Tokens are checked locally against Google's cached signing keys. If the
+    keys can't be fetched, tokeninfo verifies the token instead.
+    """
+    if GOOGLE_VERIFY_LOCALLY:
+        try:
+            token_info = await verify_google_token_locally(token)
+            metrics.incr("google_token.local")
+            return token_info
+        except httpx.HTTPError as e:
+            logging.warning(f"Fetching Google signing keys failed: {e}")
+
+    metrics.incr("google_token.remote")
+    return await verify_google_token_remote(token)